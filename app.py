@@ -1,36 +1,244 @@
-from flask import Flask, render_template, request, redirect, url_for, abort
-from titanhelp_dal.dal import TitanHelpDAL
+import csv
+import io
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from flask import Flask, Response, current_app, g, jsonify, render_template, request, redirect, url_for, abort
+from werkzeug.local import LocalProxy
+from titanhelp_dal.dal import TitanHelpDAL, NOT_FOUND, ALREADY_CLOSED
+from titanhelp_dal.feed import ChangeFeed
+from titanhelp_dal.maintenance import MaintenanceScheduler
+from titanhelp_dal.metrics import Metrics
 
-app = Flask(__name__)
+# configuration
+# every key can also be set from the environment with a TITANHELP_ prefix,
+# e.g. TITANHELP_DATABASE=/srv/titanhelp.db or TITANHELP_METRICS=0
+DEFAULT_CONFIG = {
+    # SQLite file, a "file:" URI, or ":memory:" for a throwaway database (tests)
+    "DATABASE": "titanhelp.db",
+    # extra TitanHelpDAL keyword arguments; ticket reads are cached by default
+    "DAL_OPTIONS": {"cache_size": 1024, "cache_ttl": 30.0},
+    # request/DAL/SQL metrics served at /metrics
+    "METRICS": True,
+    # statements slower than this go to the slow-query log
+    "SLOW_QUERY_MS": 100,
+    # tickets per page on the homepage
+    "PAGE_SIZE": 100,
+    # live updates: how often the shared poller reads the change log, and the
+    # longest a /changes long-poll waits before answering, and how long one
+    # /events stream stays open before the browser reconnects
+    "LIVE_INTERVAL": 1.0,
+    "LIVE_TIMEOUT": 15.0,
+    # checkpoint/analyze/vacuum in a background thread during idle windows
+    # (MaintenanceScheduler keyword arguments in MAINTENANCE_OPTIONS); with
+    # several workers, prefer one `python -m titanhelp_dal maintain` cron job
+    "MAINTENANCE": False,
+    "MAINTENANCE_OPTIONS": {},
+}
 
-# initialize DAL (creates titanhelp.db if not exists)
-dal = TitanHelpDAL("titanhelp.db")
+class TitanHelpState:
+    """
+    What one app instance shares between requests: metrics, the DAL, the
+    change feed and the maintenance scheduler. The DAL is built on first use, so creating (or importing)
+    the app never touches the database, and pre-fork servers open it in
+    each worker rather than in the parent.
+    """
+    def __init__(self, config):
+        self.config = config
+        self.metrics = Metrics(slow_query_threshold=float(config["SLOW_QUERY_MS"]) / 1000) if config["METRICS"] else None
+        self._lock = threading.Lock()
+        self._dal = None
+        self._feed = None
+        self._maintenance = None
+
+    @property
+    def dal(self):
+        if self._dal is None:
+            with self._lock:
+                if self._dal is None:
+                    self._dal = TitanHelpDAL(self.config["DATABASE"], metrics=self.metrics, **self.config["DAL_OPTIONS"])
+                    if self.config["MAINTENANCE"]:
+                        self._maintenance = MaintenanceScheduler(
+                            self._dal, metrics=self.metrics, **self.config["MAINTENANCE_OPTIONS"]
+                        )
+                        self._maintenance.start()
+        return self._dal
+
+    @property
+    def feed(self):
+        # one change-log poller per process, shared by every /events and /changes client
+        if self._feed is None:
+            dal = self.dal
+            with self._lock:
+                if self._feed is None:
+                    self._feed = ChangeFeed(dal, interval=float(self.config["LIVE_INTERVAL"]))
+        return self._feed
+
+    def close(self):
+        with self._lock:
+            feed, dal, self._feed, self._dal = self._feed, self._dal, None, None
+            maintenance, self._maintenance = self._maintenance, None
+        if maintenance is not None:
+            maintenance.close()
+        if feed is not None:
+            feed.close()
+        if dal is not None:
+            dal.close()
+
+def get_state():
+    return current_app.extensions["titanhelp"]
+
+# the current app's DAL and change feed, for use inside requests
+dal = LocalProxy(lambda: get_state().dal)
+feed = LocalProxy(lambda: get_state().feed)
+
+# views are registered on each app by create_app
+ROUTES = []
+
+def route(rule, **options):
+    def register(view):
+        ROUTES.append((rule, view, options))
+        return view
+    return register
+
+# conditional GET
+# "/" and "/ticket/<id>" are validated against the DAL's data versions, so a poll
+# that finds nothing new gets a 304 without reading tickets or rendering a template.
+# The salt changes when the templates or this file do, so a deploy never serves stale HTML.
+def _etag_salt():
+    root = os.path.dirname(os.path.abspath(__file__))
+    crc = 0
+    for folder, _, files in sorted(os.walk(os.path.join(root, "templates"))):
+        for fname in sorted(files):
+            with open(os.path.join(folder, fname), "rb") as f:
+                crc = zlib.crc32(f.read(), crc)
+    with open(os.path.abspath(__file__), "rb") as f:
+        crc = zlib.crc32(f.read(), crc)
+    return f"{crc:08x}"
+
+ETAG_SALT = _etag_salt()
+TICKET_ETAG_RX = re.compile(r"^t(\d+)-v(\d+)-s(\d+)-([0-9a-f]+)$")
+
+def http_date(timestamp):
+    # 'YYYY-MM-DD HH:MM:SS' (UTC) -> aware datetime for Last-Modified
+    if not timestamp:
+        return None
+    try:
+        return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+def settled(last_modified):
+    """
+    `last_modified` once its second is over, else None. HTTP dates have
+    one-second resolution, so a change later in the same second would not
+    move it: until then only the ETag can tell the versions apart.
+    """
+    if last_modified and datetime.now(timezone.utc) - last_modified >= timedelta(seconds=1):
+        return last_modified
+    return None
+
+def is_fresh(etag, last_modified):
+    """True when the request's If-None-Match / If-Modified-Since still match."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    last_modified = settled(last_modified)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+def with_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    last_modified = settled(last_modified)
+    if last_modified:
+        response.last_modified = last_modified
+    # always revalidate; a 304 is cheap
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified(etag, last_modified):
+    return with_validators(Response(status=304), etag, last_modified)
 
 # homepage
-@app.route("/")
+@route("/")
 def index():
     try:
-        # fetch all tickets from DAL
-        tickets = dal.list_tickets()
+        version = dal.data_version()
+    except Exception as e:
+        return render_template("error.html", code=500, error=f"Database Connection Failed: {e}"), 500
+    etag = f"list-s{version.seq}-{ETAG_SALT}"
+    last_modified = http_date(version.changed_at)
+    if is_fresh(etag, last_modified):
+        return not_modified(etag, last_modified)
+    body, status = render_index()
+    if status != 200:
+        return body, status
+    return with_validators(current_app.make_response((body, status)), etag, last_modified)
+
+def render_index(msg=None):
+    q = (request.args.get("q") or "").strip()
+    cursor = request.args.get("cursor") or None
+    page = None
+    try:
+        # search shows the best matches first; plain listing pages newest first
+        # the list only shows a description preview; /ticket/<id> loads the full text
+        if q:
+            tickets = dal.list_tickets(search=q, sort="rank", summary=True)
+        else:
+            page = dal.page_tickets(limit=current_app.config["PAGE_SIZE"], cursor=cursor, summary=True)
+            tickets = page.tickets
+    except ValueError as e:
+        return render_template("error.html", code=400, error=f"ValueError: {e}"), 400
     except Exception as e:
         return render_template("error.html", code=500, error=f"Database Connection Failed: {e}"), 500
-    return render_template("index.html", tickets=tickets)
+    return render_template("index.html", tickets=tickets, q=q, page=page, msg=msg), 200
+
+def client_ticket_versions(ticket_id):
+    """(version, seq) pairs from If-None-Match tags we issued for this ticket."""
+    pairs = []
+    for tag in request.if_none_match.as_set(include_weak=True):
+        m = TICKET_ETAG_RX.match(tag)
+        if m and int(m.group(1)) == ticket_id and m.group(4) == ETAG_SALT:
+            pairs.append((int(m.group(2)), int(m.group(3))))
+    return pairs
 
 # view ticket
-@app.route("/ticket/<int:ticket_id>")
+@route("/ticket/<int:ticket_id>")
 def view_ticket(ticket_id):
-    # fetch a single ticket from DAL
+    # revalidation: if nothing at all changed since the client's copy (same change
+    # counter), answer from that alone; otherwise compare the ticket's own version
     try:
-        ticket = dal.get_ticket(ticket_id)
+        version = dal.data_version()
+        cached = client_ticket_versions(ticket_id)
+        if cached:
+            for v, seq in cached:
+                if seq == version.seq:
+                    return not_modified(f"t{ticket_id}-v{v}-s{seq}-{ETAG_SALT}", None)
+            current = dal.ticket_version(ticket_id)
+            if current and any(v == current.version for v, _ in cached):
+                etag = f"t{ticket_id}-v{current.version}-s{version.seq}-{ETAG_SALT}"
+                return not_modified(etag, http_date(current.modified_at))
+        # fetch a single ticket from DAL; old links keep working once a ticket is archived
+        ticket = dal.get_ticket(ticket_id, include_archived=True)
     except Exception as e:
         return render_template("error.html", code=500, error=f"Unexpected Error: {e}"), 500
 
     if not ticket:
         return render_template("error.html", code="404", error="Ticket not found."), 404
-    return render_template("view_ticket.html", ticket=ticket), 200
+    etag = f"t{ticket_id}-v{ticket.version}-s{version.seq}-{ETAG_SALT}"
+    last_modified = http_date(ticket.updated_at or ticket.created_at)
+    if is_fresh(etag, last_modified):
+        return not_modified(etag, last_modified)
+    response = current_app.make_response((render_template("view_ticket.html", ticket=ticket), 200))
+    return with_validators(response, etag, last_modified)
 
 # new ticket page
-@app.route("/new-ticket", methods=["GET", "POST"])
+@route("/new-ticket", methods=["GET", "POST"])
 def new_ticket():
     if request.method == "POST":
         name = (request.form.get("name") or "").strip()
@@ -58,37 +266,235 @@ def new_ticket():
     return render_template("new_ticket.html"), 200
 
 # close ticket
-@app.route("/ticket/<int:ticket_id>/close", methods=["POST"])
+# a single conditional UPDATE in the DAL, so two concurrent closes cannot both succeed
+@route("/ticket/<int:ticket_id>/close", methods=["POST"])
 def close_ticket(ticket_id):
-    try: 
-        ticket = dal.get_ticket(ticket_id)
+    try:
+        result = dal.close_ticket(ticket_id)
     except ValueError as e:
-         return render_template("error.html", ticket=ticket, code=400, error=f"ValueError: {e}"), 400
+        return render_template("error.html", code=400, error=f"ValueError: {e}"), 400
     except Exception as e:
-        return render_template("error.html", ticket=ticket, code=500, error=f"Unexpected Error: {e}"), 500
+        return render_template("error.html", code=500, error=f"Unexpected Error: {e}"), 500
 
-    if not ticket:
+    if result.outcome == NOT_FOUND:
         return render_template("error.html", code=404, error="Ticket not found."), 404
 
-    if ticket.status == "Closed":
+    if result.outcome == ALREADY_CLOSED:
         return render_template("error.html", code=400, error="Ticket has already been closed."), 400
 
+    return render_template("view_ticket.html", ticket=result.ticket, msg="Ticket has been successfully closed"), 200 # sorry shaun, needed more status code support
+
+# bulk status / priority change for the tickets ticked on the homepage
+@route("/tickets/bulk", methods=["POST"])
+def bulk_update():
+    try:
+        ids = [int(i) for i in request.form.getlist("ids")]
+    except ValueError:
+        return render_template("error.html", code=400, error="Ticket ids must be numbers."), 400
+    status = request.form.get("status") or None
+    priority = request.form.get("priority") or None
+
+    if not ids:
+        return render_template("error.html", code=400, error="No tickets selected."), 400
+    if not status and not priority:
+        return render_template("error.html", code=400, error="Choose a status or priority to apply."), 400
+
     try:
-        dal.set_status(ticket_id, "Closed")
+        updated = dal.update_many(ids, status=status, priority=priority)
     except ValueError as e:
         return render_template("error.html", code=400, error=f"ValueError: {e}"), 400
     except Exception as e:
         return render_template("error.html", code=500, error=f"Unexpected Error: {e}"), 500
 
-    ticket.status = "Closed"
-    return render_template("view_ticket.html", ticket=ticket, msg="Ticket has been successfully closed"), 200 # sorry shaun, needed more status code support
+    return render_index(msg=f"Updated {len(updated)} of {len(set(ids))} selected tickets")
+
+# ticket statistics dashboard
+@route("/stats")
+def stats():
+    try:
+        ticket_stats = dal.stats()
+    except Exception as e:
+        return render_template("error.html", code=500, error=f"Unexpected Error: {e}"), 500
+    return render_template("stats.html", stats=ticket_stats), 200
+
+@route("/stats.json")
+def stats_json():
+    try:
+        ticket_stats = dal.stats()
+    except Exception as e:
+        return jsonify(error=f"Unexpected Error: {e}"), 500
+    return jsonify(ticket_stats.to_dict()), 200
+
+# export tickets
+# rows are streamed straight from the DAL iterator, so the response starts at once
+# and memory stays flat however many tickets match
+EXPORT_FIELDS = ("id", "name", "description", "status", "priority", "created_at")
+
+def export_tickets():
+    args = request.args
+    return dal.iter_tickets(
+        status=args.get("status") or None,
+        priority=args.get("priority") or None,
+        search=(args.get("q") or "").strip() or None,
+        created_since=args.get("since") or None,
+        created_before=args.get("before") or None,
+    )
+
+def stream_csv(tickets):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    for n, ticket in enumerate(tickets, start=1):
+        writer.writerow([getattr(ticket, f) for f in EXPORT_FIELDS])
+        if n % 500 == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+def stream_jsonl(tickets):
+    for ticket in tickets:
+        yield json.dumps(ticket.to_dict()) + "\n"
+
+@route("/export.csv")
+def export_csv():
+    try:
+        tickets = export_tickets()
+    except ValueError as e:
+        return render_template("error.html", code=400, error=f"ValueError: {e}"), 400
+    return Response(stream_csv(tickets), mimetype="text/csv",
+                    headers={"Content-Disposition": "attachment; filename=tickets.csv"})
+
+@route("/export.jsonl")
+def export_jsonl():
+    try:
+        tickets = export_tickets()
+    except ValueError as e:
+        return render_template("error.html", code=400, error=f"ValueError: {e}"), 400
+    return Response(stream_jsonl(tickets), mimetype="application/x-ndjson",
+                    headers={"Content-Disposition": "attachment; filename=tickets.jsonl"})
+
+# metrics
+# per-route latency comes from request hooks; create_app only installs them when metrics are on
+def start_timer():
+    g.request_started = time.perf_counter()
+
+def record_latency(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+        labels = (("route", rule), ("method", request.method), ("status", str(response.status_code)))
+        get_state().metrics.observe("titanhelp_http_request_seconds", labels, time.perf_counter() - started)
+    return response
+
+@route("/metrics")
+def metrics_endpoint():
+    metrics = get_state().metrics
+    if metrics is None:
+        abort(404)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+# live updates
+# /changes is a JSON long-poll; /events streams the same changes as server-sent events
+def parse_seq(value):
+    if value in (None, ""):
+        return None
+    seq = int(value)
+    if seq < 0:
+        raise ValueError("seq must not be negative")
+    return seq
+
+@route("/changes")
+def changes():
+    try:
+        since = parse_seq(request.args.get("since"))
+        limit = current_app.config["LIVE_TIMEOUT"]
+        timeout = float(request.args.get("timeout", limit))
+        if not math.isfinite(timeout):
+            raise ValueError("timeout must be finite")
+        timeout = max(0.0, min(timeout, limit))
+    except ValueError:
+        return jsonify(error="since and timeout must be numbers"), 400
+    try:
+        if since is None:
+            return jsonify(changes=[], last_seq=feed.head()), 200
+        found = feed.wait(since, timeout)
+        if found is None:
+            # too far behind: the client reloads and starts again from last_seq
+            return jsonify(changes=[], last_seq=feed.head(), reset=True), 200
+    except Exception as e:
+        return jsonify(error=f"Unexpected Error: {e}"), 500
+    last_seq = found[-1].seq if found else since
+    return jsonify(changes=[c.to_dict() for c in found], last_seq=last_seq), 200
+
+def stream_events(feed, seq, timeout):
+    # runs after the request context is gone: gets the feed itself, not the proxy.
+    # The stream ends after `timeout` seconds so it never pins a sync worker for
+    # long; EventSource reconnects after `retry` ms and resumes from Last-Event-ID.
+    deadline = time.monotonic() + timeout
+    yield f"retry: 1000\nid: {seq}\nevent: hello\ndata: {json.dumps({'last_seq': seq})}\n\n"
+    while True:
+        found = feed.wait(seq, deadline - time.monotonic())
+        if found is None:
+            yield "event: reset\ndata: {}\n\n"
+            return
+        if not found:
+            # out of time (or the feed is shutting down)
+            return
+        for change in found:
+            seq = change.seq
+            yield f"id: {seq}\nevent: change\ndata: {json.dumps(change.to_dict())}\n\n"
+
+@route("/events")
+def events():
+    try:
+        # browsers resend the last id they saw when they reconnect
+        seq = parse_seq(request.headers.get("Last-Event-ID") or request.args.get("since"))
+    except ValueError:
+        return jsonify(error="Last-Event-ID must be a number"), 400
+    live = get_state().feed
+    try:
+        # also primes the feed, so the stream itself only reads memory
+        head = live.head()
+    except Exception as e:
+        return jsonify(error=f"Unexpected Error: {e}"), 500
+    if seq is None:
+        seq = head
+    return Response(stream_events(live, seq, current_app.config["LIVE_TIMEOUT"]), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # simple error page
 # send users to this page instead of index when dealing with existing tickets
 # if users are sent to index with an error the tickets will not load
-@app.route("/error")
+@route("/error")
 def error():
     return render_template("error.html", info="How did you get here?"), 418
 
+def create_app(config=None):
+    """
+    Build the web app. `config` overrides DEFAULT_CONFIG and TITANHELP_*
+    environment variables; e.g. create_app({"DATABASE": ":memory:"}) for tests.
+    """
+    app = Flask(__name__)
+    app.config.from_mapping(
+        DEFAULT_CONFIG,
+        DAL_OPTIONS=dict(DEFAULT_CONFIG["DAL_OPTIONS"]),
+        MAINTENANCE_OPTIONS=dict(DEFAULT_CONFIG["MAINTENANCE_OPTIONS"]),
+    )
+    app.config.from_prefixed_env("TITANHELP")
+    if config:
+        app.config.update(config)
+    state = TitanHelpState(app.config)
+    app.extensions["titanhelp"] = state
+    for rule, view, options in ROUTES:
+        app.add_url_rule(rule, view_func=view, **options)
+    if state.metrics is not None:
+        app.before_request(start_timer)
+        app.after_request(record_latency)
+    return app
+
+# for `flask run` and WSGI servers (app:app); the database is opened on the first request
+app = create_app()
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,298 @@
+"""
+Performance benchmarks for the TitanHelp DAL and HTTP routes.
+
+Seeds a database per size with realistic ticket text, then measures latency
+percentiles and throughput for the hot DAL calls and for the Flask routes
+driven by concurrent test clients. Results are written as JSON; pass
+--baseline to compare against an earlier run and fail on regressions.
+
+    python benchmarks/bench.py --sizes 1000 100000 --out bench.json
+    python benchmarks/bench.py --sizes 1000 --baseline bench.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from titanhelp_dal import PRIORITY_VALUES, STATUS_VALUES, TitanHelpDAL  # noqa: E402
+
+# metric -> True when a bigger number is better
+METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "ops_per_s": True}
+# p99 of a few hundred samples is too noisy to gate on by default
+DEFAULT_COMPARE = ("p50_ms", "p95_ms", "ops_per_s")
+
+
+# ---- Seed data ----
+def _words() -> List[str]:
+    with open(ROOT / "tests" / "test_data.json") as f:
+        text = " ".join(json.load(f).values())
+    return [w.strip(".,!?").lower() for w in text.split() if w.strip(".,!?")]
+
+
+def _sentence(rng: random.Random, words: List[str], max_len: int) -> str:
+    target = rng.randint(max(10, max_len // 20), max_len)
+    out = ""
+    while len(out) < target:
+        out += (" " if out else "") + rng.choice(words)
+    return out[:target].strip().capitalize() or "Ticket"
+
+
+def fake_tickets(n: int, seed: int = 1) -> Iterator[Dict[str, str]]:
+    """Tickets with name/description lengths spread like the app's real limits."""
+    rng = random.Random(seed)
+    words = _words()
+    for _ in range(n):
+        yield {
+            "name": _sentence(rng, words, 100),
+            "description": _sentence(rng, words, 1000),
+            "status": rng.choices(STATUS_VALUES, weights=(5, 2, 3))[0],
+            "priority": rng.choices(PRIORITY_VALUES, weights=(5, 3, 2))[0],
+        }
+
+
+def seed_database(path: str, size: int) -> None:
+    """Create (or reuse, if it already has `size` tickets) a seeded database."""
+    if os.path.exists(path):
+        with sqlite3.connect(path) as conn:
+            try:
+                if conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0] == size:
+                    return
+            except sqlite3.OperationalError:
+                pass
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    dal = TitanHelpDAL(path, synchronous="OFF")
+    dal.create_tickets_bulk(fake_tickets(size), batch_size=5000)
+    dal.close()
+
+
+# ---- Measurement ----
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "n": len(ordered),
+        "p50_ms": round(pct(0.50), 4),
+        "p95_ms": round(pct(0.95), 4),
+        "p99_ms": round(pct(0.99), 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "ops_per_s": round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def measure(op: Callable[[int], Any], n: int, *, concurrency: int = 1) -> Dict[str, float]:
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        start = time.perf_counter()
+        op(i)
+        took = time.perf_counter() - start
+        with lock:
+            latencies.append(took)
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        for i in range(n):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(n)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+# ---- Benchmarks ----
+def bench_dal(path: str, size: int, n: int, *, cache_size: int = 0) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(2)
+    dal = TitanHelpDAL(path, cache_size=cache_size)
+    max_id = size
+    open_ids = [t.id for t in dal.iter_tickets(status="Open", sort="id")][: n]
+    rng.shuffle(open_ids)
+    results = {
+        "get_ticket": measure(lambda i: dal.get_ticket(rng.randint(1, max_id)), n),
+        "list_tickets": measure(lambda i: dal.list_tickets(), n),
+        "list_tickets_filtered": measure(
+            lambda i: dal.list_tickets(status=STATUS_VALUES[i % 3], priority=PRIORITY_VALUES[i % 3]), n
+        ),
+        "list_tickets_search": measure(lambda i: dal.list_tickets(search="lorem ipsum", limit=20), n),
+        "page_tickets_deep": _bench_deep_page(dal, n),
+        "create_ticket": measure(lambda i: dal.create_ticket(f"Bench {i}", "Benchmark ticket", priority="Medium"), n),
+        "close_ticket": measure(lambda i: dal.close_ticket(open_ids[i % len(open_ids)]) if open_ids else None, n),
+    }
+    dal.close()
+    return results
+
+
+def _bench_deep_page(dal: TitanHelpDAL, n: int) -> Dict[str, float]:
+    # walk down to the last page once, then time fetching pages from there
+    page = dal.page_tickets(limit=100)
+    cursors = []
+    while page.next_cursor:
+        cursors.append(page.next_cursor)
+        page = dal.page_tickets(limit=100, cursor=page.next_cursor)
+    cursors = cursors[-10:] or [None]
+    return measure(lambda i: dal.page_tickets(limit=100, cursor=cursors[i % len(cursors)]), n)
+
+
+def bench_http(path: str, size: int, n: int, concurrency: int) -> Dict[str, Dict[str, float]]:
+    from app import create_app
+
+    app = create_app({"DATABASE": path, "DAL_OPTIONS": {"cache_size": 1024}})
+    rng = random.Random(3)
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        return local.client
+
+    def get(url: str) -> None:
+        response = client().get(url)
+        assert response.status_code == 200, (url, response.status_code)
+
+    def post_ticket(i: int) -> None:
+        response = client().post("/new-ticket", data={"name": f"HTTP {i}", "description": "Benchmark", "priority": "Low"})
+        assert response.status_code == 201, response.status_code
+
+    try:
+        return {
+            "GET /": measure(lambda i: get("/"), n, concurrency=concurrency),
+            "GET /ticket/<id>": measure(lambda i: get(f"/ticket/{rng.randint(1, size)}"), n, concurrency=concurrency),
+            "POST /new-ticket": measure(post_ticket, n, concurrency=concurrency),
+        }
+    finally:
+        app.extensions["titanhelp"].close()
+
+
+def run(sizes: List[int], n: int, concurrency: int, db_dir: str, cache_size: int = 0) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "n": n,
+            "concurrency": concurrency,
+            "cache_size": cache_size,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        path = os.path.join(db_dir, f"bench_{size}.db")
+        started = time.perf_counter()
+        seed_database(path, size)
+        print(f"[{size}] seeded in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        # the write benchmarks add tickets; work on a copy so the seed stays reusable
+        work = os.path.join(db_dir, f"bench_{size}_run.db")
+        _copy_db(path, work)
+        results = bench_dal(work, size, n, cache_size=cache_size)
+        results.update(bench_http(work, size, n, concurrency))
+        report["results"][str(size)] = results
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(work + suffix):
+                os.remove(work + suffix)
+    return report
+
+
+def _copy_db(src: str, dst: str) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(dst + suffix):
+            os.remove(dst + suffix)
+    with sqlite3.connect(src) as source, sqlite3.connect(dst) as target:
+        source.backup(target)
+
+
+# ---- Baseline comparison ----
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+    metrics: Sequence[str] = DEFAULT_COMPARE,
+) -> List[Dict[str, Any]]:
+    """One row per (size, benchmark, metric) present in both runs; `regression` marks drops beyond threshold."""
+    rows = []
+    for size, benches in current["results"].items():
+        for name, result in benches.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base:
+                continue
+            for metric in metrics:
+                higher_is_better = METRICS[metric]
+                old, new = base.get(metric), result.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                worse = -change if higher_is_better else change
+                rows.append({
+                    "size": size, "benchmark": name, "metric": metric,
+                    "baseline": old, "current": new, "change": round(change, 4),
+                    "regression": worse > threshold,
+                })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    for r in rows:
+        flag = "REGRESSION" if r["regression"] else ""
+        print(f"{r['size']:>8} {r['benchmark']:<24} {r['metric']:<10} "
+              f"{r['baseline']:>12.3f} -> {r['current']:>12.3f} {r['change']:+8.1%} {flag}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="tickets to seed per run (default: 1000)")
+    parser.add_argument("-n", type=int, default=500, help="operations per benchmark (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent HTTP clients (default: %(default)s)")
+    parser.add_argument("--cache-size", type=int, default=0, help="DAL read cache for the DAL benchmarks (default: off)")
+    parser.add_argument("--db-dir", help="where seeded databases are kept and reused (default: a temp dir)")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing (default: 0.10)")
+    parser.add_argument("--metrics", nargs="+", choices=sorted(METRICS), default=list(DEFAULT_COMPARE),
+                        help="metrics to compare (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.db_dir:
+        os.makedirs(args.db_dir, exist_ok=True)
+        report = run(args.sizes, args.n, args.concurrency, args.db_dir, args.cache_size)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            report = run(args.sizes, args.n, args.concurrency, tmp, args.cache_size)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(report, json.load(f), args.threshold, args.metrics)
+        report["comparison"] = rows
+        print_comparison(rows)
+        status = 1 if any(r["regression"] for r in rows) else 0
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,7 @@ from titanhelp_dal.dal import TitanHelpDAL, Ticket, STATUS_VALUES, PRIORITY_VALU
 
 
 TIMESTAMP_RX = re.compile(r"^\d{2}-\d{2}-\d{4} \d{2}:\d{2}:\d{2}$") 
+ISO_TIMESTAMP_RX = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
 
 @pytest.fixture
 def db_path(tmp_path: Path) -> str:
@@ -29,7 +30,8 @@ def test_create_ticket_valid_returns_ticket_with_defaults(dal: TitanHelpDAL):
     assert t.description == "2nd lab"
     assert t.status == "Open"
     assert t.priority == "High"
-    assert t.created_at and TIMESTAMP_RX.match(t.created_at)
+    assert t.created_at and ISO_TIMESTAMP_RX.match(t.created_at)
+    assert TIMESTAMP_RX.match(t.date)
 
 def test_create_ticket_applies_default_priority_low(dal: TitanHelpDAL):
     t = dal.create_ticket(name="Mouse broken", description="Comp Lab")
@@ -119,4 +121,1049 @@ def test_defaults_on_creation(dal: TitanHelpDAL):
     t = dal.create_ticket("Scanner", "Not detected")
     assert t.status == "Open"
     assert t.priority == "Low"
-    assert t.created_at and TIMESTAMP_RX.match(t.created_at)
\ No newline at end of file
+    assert t.created_at and ISO_TIMESTAMP_RX.match(t.created_at)
+    assert TIMESTAMP_RX.match(t.date)
+
+# connection pool
+
+def test_sequential_calls_reuse_one_connection(dal: TitanHelpDAL):
+    t = dal.create_ticket("Laptop", "Won't boot")
+    dal.get_ticket(t.id)
+    dal.set_status(t.id, "Closed")
+    stats = dal.pool_stats()
+    assert stats.created == 1
+    assert stats.open == 1 and stats.in_use == 0
+    assert stats.checkouts >= 4
+
+def test_pool_is_bounded_under_threads(db_path: str):
+    import threading
+    dal = TitanHelpDAL(db_path, journal_mode="WAL", synchronous="OFF", pool_size=2)
+    t = dal.create_ticket("Shared", "Read by many threads")
+    errors = []
+
+    def reader():
+        try:
+            for _ in range(50):
+                assert dal.get_ticket(t.id).name == "Shared"
+        except Exception as e:  # pragma: no cover - surfaced below
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert not errors
+    stats = dal.pool_stats()
+    assert stats.created <= 2
+    assert stats.checkouts >= 8 * 50
+    dal.close()
+
+def test_failed_write_rolls_back_and_returns_connection(dal: TitanHelpDAL):
+    import sqlite3
+    with pytest.raises(sqlite3.IntegrityError):
+        with dal._connect() as conn:
+            conn.execute("INSERT INTO tickets(name, description) VALUES (?, ?)", ("ok", "ok"))
+            conn.execute("INSERT INTO tickets(name, description, status) VALUES (?, ?, ?)", ("x", "y", "Bogus"))
+    assert dal.list_tickets() == []
+    assert dal.pool_stats().in_use == 0
+
+
+# full-text search
+
+def test_search_prefix_and_phrase(dal: TitanHelpDAL):
+    a = dal.create_ticket("Printer jam", "Paper stuck in tray two")
+    b = dal.create_ticket("Network", "Printer offline on floor two")
+    dal.create_ticket("Email", "Outlook crashes")
+    assert {t.id for t in dal.list_tickets(search="print")} == {a.id, b.id}
+    assert [t.id for t in dal.list_tickets(search='"tray two"')] == [a.id]
+    assert dal.list_tickets(search='"two tray"') == []
+    assert [t.id for t in dal.list_tickets(search="print offline")] == [b.id]
+
+def test_search_ranked_and_filtered(dal: TitanHelpDAL):
+    weak = dal.create_ticket("Monitor", "Flickers, maybe the cable is loose", priority="High")
+    strong = dal.create_ticket("Cable cable", "Cable unplugged")
+    assert [t.id for t in dal.list_tickets(search="cable", sort="rank")] == [strong.id, weak.id]
+    assert [t.id for t in dal.list_tickets(search="cable", priority="High")] == [weak.id]
+
+def test_search_index_follows_updates_and_deletes(dal: TitanHelpDAL):
+    t = dal.create_ticket("Keyboard", "Sticky keys")
+    dal.update_ticket(t.id, description="Missing spacebar")
+    assert dal.list_tickets(search="sticky") == []
+    assert [x.id for x in dal.list_tickets(search="spacebar")] == [t.id]
+    dal.delete_ticket(t.id)
+    assert dal.list_tickets(search="spacebar") == []
+
+def test_search_punctuation_is_not_fts_syntax(dal: TitanHelpDAL):
+    t = dal.create_ticket("Error 0x80070005", "Access denied (C:\\Users) - OR NOT")
+    assert [x.id for x in dal.list_tickets(search="0x8007")] == [t.id]
+    assert dal.list_tickets(search='AND OR "') == []
+
+def test_existing_database_is_backfilled(db_path: str):
+    import sqlite3
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+            "created_at TEXT NOT NULL DEFAULT (strftime('%m-%d-%Y %H:%M:%S','now')), "
+            "description TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'Open', priority TEXT NOT NULL DEFAULT 'Low')"
+        )
+        conn.execute("INSERT INTO tickets(name, description) VALUES ('Old ticket', 'Projector bulb')")
+    dal = TitanHelpDAL(db_path, journal_mode="DELETE", synchronous="OFF")
+    assert [t.name for t in dal.list_tickets(search="projector")] == ["Old ticket"]
+    dal.close()
+
+
+# keyset pagination
+
+def _walk(dal: TitanHelpDAL, **kw):
+    pages, cursor = [], None
+    while True:
+        page = dal.page_tickets(cursor=cursor, **kw)
+        pages.append(page)
+        cursor = page.next_cursor
+        if not cursor:
+            return pages
+
+def test_page_tickets_walks_every_ticket_once(dal: TitanHelpDAL):
+    ids = [dal.create_ticket(f"T{i}", "desc").id for i in range(7)]
+    pages = _walk(dal, limit=3)
+    assert [len(p.tickets) for p in pages] == [3, 3, 1]
+    seen = [t.id for p in pages for t in p.tickets]
+    assert seen == sorted(ids, reverse=True)
+    assert pages[0].prev_cursor is None
+
+def test_page_tickets_prev_returns_previous_page(dal: TitanHelpDAL):
+    for i in range(7):
+        dal.create_ticket(f"T{i}", "desc")
+    first = dal.page_tickets(limit=3)
+    second = dal.page_tickets(limit=3, cursor=first.next_cursor)
+    back = dal.page_tickets(limit=3, cursor=second.prev_cursor)
+    assert [t.id for t in back.tickets] == [t.id for t in first.tickets]
+    assert back.prev_cursor is None
+    assert back.next_cursor is not None
+
+def test_page_tickets_stable_when_tickets_arrive(dal: TitanHelpDAL):
+    for i in range(4):
+        dal.create_ticket(f"T{i}", "desc")
+    first = dal.page_tickets(limit=2)
+    dal.create_ticket("Late arrival", "desc")
+    second = dal.page_tickets(limit=2, cursor=first.next_cursor)
+    assert not {t.id for t in first.tickets} & {t.id for t in second.tickets}
+    assert "Late arrival" not in [t.name for t in second.tickets]
+
+def test_page_tickets_filters_and_bad_cursor(dal: TitanHelpDAL):
+    for i in range(5):
+        dal.create_ticket(f"T{i}", "desc", priority="High" if i % 2 else "Low")
+    pages = _walk(dal, limit=1, priority="High")
+    assert [t.priority for p in pages for t in p.tickets] == ["High", "High"]
+    with pytest.raises(ValueError, match="Invalid page cursor"):
+        dal.page_tickets(cursor="not-a-cursor")
+
+
+# schema migrations
+
+LEGACY_SCHEMA = (
+    "CREATE TABLE tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL CHECK(length(name) <= 100), "
+    "created_at TEXT NOT NULL DEFAULT (strftime('%m-%d-%Y %H:%M:%S','now')), "
+    "description TEXT NOT NULL CHECK(length(description) <= 1000), "
+    "status TEXT NOT NULL DEFAULT 'Open' CHECK(status IN ('Open','In Progress','Closed')), "
+    "priority TEXT NOT NULL DEFAULT 'Low' CHECK(priority IN ('Low','Medium','High')))"
+)
+
+def test_legacy_timestamps_migrated_in_batches(db_path: str):
+    import sqlite3
+    from titanhelp_dal.migrations import SCHEMA_VERSION
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(LEGACY_SCHEMA)
+        conn.executemany(
+            "INSERT INTO tickets(name, description, created_at) VALUES (?, ?, ?)",
+            [("Jan", "d", "01-05-2025 09:00:00"), ("Dec", "d", "12-20-2024 17:30:00"), ("Feb", "d", "02-01-2025 08:00:00")],
+        )
+    dal = TitanHelpDAL(db_path, journal_mode="DELETE", synchronous="OFF", migration_batch_size=2)
+    assert dal.schema_version() == SCHEMA_VERSION
+    tickets = dal.list_tickets()
+    assert [t.name for t in tickets] == ["Feb", "Jan", "Dec"]
+    assert tickets[2].created_at == "2024-12-20 17:30:00"
+    assert tickets[2].date == "12-20-2024 17:30:00"
+    dal.close()
+
+def test_current_schema_skips_migrations(db_path: str):
+    import sqlite3
+    from titanhelp_dal.migrations import migrate
+    TitanHelpDAL(db_path).close()
+    statements = []
+    with sqlite3.connect(db_path) as conn:
+        conn.set_trace_callback(statements.append)
+        assert migrate(conn) == []
+    assert statements == ["PRAGMA user_version;"]
+
+def test_memory_database_shared_by_pool_until_close():
+    import threading
+    dal = TitanHelpDAL(":memory:")
+    t = dal.create_ticket("In memory", "Shared across connections")
+    seen = []
+    # another thread gets another pooled connection to the same database
+    thread = threading.Thread(target=lambda: seen.append(dal.get_ticket(t.id)))
+    thread.start()
+    thread.join()
+    assert seen[0].name == "In memory"
+    other = TitanHelpDAL(":memory:")
+    assert other.get_ticket(t.id) is None
+    path = dal.db_path
+    dal.close()
+    other.close()
+    fresh = TitanHelpDAL(path)
+    assert fresh.list_tickets() == []
+    fresh.close()
+
+def test_data_versions_migration_can_be_rerun(dal: TitanHelpDAL):
+    from titanhelp_dal.migrations import MIGRATIONS
+    v7 = next(m for m in MIGRATIONS if m.version == 7)
+    with dal._connect() as conn:
+        v7.apply(conn, 100)
+    t = dal.create_ticket("Rerun", "desc")
+    before = dal.data_version().seq
+    dal.set_status(t.id, "In Progress")
+    assert dal.data_version().seq == before + 1
+    assert dal.get_ticket(t.id).version == 2
+
+def test_dal_inserts_ignore_the_legacy_created_at_default(db_path: str):
+    import sqlite3
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(LEGACY_SCHEMA)
+    dal = TitanHelpDAL(db_path, journal_mode="DELETE", synchronous="OFF")
+    before = dal.data_version().seq
+    t = dal.create_ticket("New", "desc")
+    assert dal.data_version().seq == before + 1
+    assert (t.version, t.updated_at) == (1, None)
+    batched = dal._create_batch([("Batched", "desc", "Low")])[0]
+    dal.create_tickets_bulk([{"name": "Bulk", "description": "desc"}])
+    assert all(ISO_TIMESTAMP_RX.match(x.created_at) for x in dal.list_tickets())
+    assert batched == dal.get_ticket(batched.id)
+    assert dal.check_stats() == []
+    dal.close()
+
+def test_composite_indexes_replace_single_column_ones(dal: TitanHelpDAL):
+    with dal._connect() as conn:
+        names = {r["name"] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM tickets WHERE status = ? AND priority = ? ORDER BY created_at DESC",
+            ("Open", "High"),
+        ).fetchall()
+    assert "idx_tickets_status_priority_created" in names
+    assert "idx_tickets_status" not in names and "idx_tickets_priority" not in names
+    assert "idx_tickets_status_priority_created" in plan[0]["detail"]
+    assert not any("TEMP B-TREE" in r["detail"] for r in plan)
+
+
+# bulk import
+
+def test_create_tickets_bulk_reports_bad_rows_and_keeps_good(dal: TitanHelpDAL):
+    rows = [
+        {"name": "Disk full", "description": "Server 3", "priority": "High"},
+        {"name": "", "description": "no name"},
+        {"name": "Bad priority", "description": "x", "priority": "Urgent"},
+        "not a mapping",
+        ValueError("Invalid JSON on line 5"),
+        {"name": "Backup failed", "description": "Nightly job", "status": "In Progress"},
+    ]
+    result = dal.create_tickets_bulk(iter(rows), batch_size=2)
+    assert result.inserted == 2
+    assert result.failed == 4
+    assert [e.row for e in result.errors] == [2, 3, 4, 5]
+    assert "Name is required" in result.errors[0].message
+    assert "Invalid JSON" in result.errors[3].message
+    statuses = {t.name: t.status for t in dal.list_tickets()}
+    assert statuses == {"Disk full": "Open", "Backup failed": "In Progress"}
+
+def test_create_tickets_bulk_caps_stored_errors(dal: TitanHelpDAL):
+    rows = ({"name": "", "description": "x"} for _ in range(50))
+    result = dal.create_tickets_bulk(rows, max_errors=5)
+    assert result.failed == 50 and len(result.errors) == 5
+
+def test_import_cli_jsonl_and_csv(db_path: str, tmp_path: Path, capsys):
+    from titanhelp_dal.__main__ import main
+    jsonl = tmp_path / "tickets.jsonl"
+    jsonl.write_text('{"name": "A", "description": "first"}\n\n{broken\n{"name": "B", "description": "second"}\n')
+    csv_file = tmp_path / "tickets.csv"
+    csv_file.write_text("name,description,priority\nC,third,Medium\n")
+    assert main(["--db", db_path, "import", str(jsonl), "--batch-size", "1"]) == 1
+    assert "record 2: Invalid JSON on line 3" in capsys.readouterr().err
+    assert main(["--db", db_path, "import", str(csv_file)]) == 0
+    dal = TitanHelpDAL(db_path)
+    assert sorted(t.name for t in dal.list_tickets()) == ["A", "B", "C"]
+    dal.close()
+
+
+# streaming iteration
+
+def test_iter_tickets_streams_in_chunks_with_filters(dal: TitanHelpDAL):
+    ids = [dal.create_ticket(f"T{i}", "desc", priority="High" if i % 2 else "Low").id for i in range(7)]
+    it = dal.iter_tickets(chunk_size=2)
+    assert dal.pool_stats().in_use == 0          # nothing runs until iterated
+    assert next(it).id == ids[0]
+    assert dal.pool_stats().in_use == 0          # connection returned between chunks
+    assert [t.id for t in it] == ids[1:]
+    assert dal.pool_stats().in_use == 0
+    assert [t.id for t in dal.iter_tickets(priority="High")] == ids[1::2]
+
+def test_iter_tickets_slow_consumers_do_not_hold_the_pool(db_path: str):
+    dal = TitanHelpDAL(db_path, journal_mode="WAL", synchronous="OFF", pool_size=1, pool_timeout=0.1)
+    ids = [dal.create_ticket(f"T{i}", "desc").id for i in range(5)]
+    downloads = [dal.iter_tickets(chunk_size=2) for _ in range(3)]
+    assert [next(d).id for d in downloads] == [ids[0]] * 3
+    dal.delete_ticket(ids[2])                   # no PoolTimeout mid-stream
+    late = dal.create_ticket("Late", "desc")
+    assert [t.id for t in downloads[0]] == ids[1:2] + ids[3:] + [late.id]
+    assert [t.id for t in dal.iter_tickets(sort="created_at DESC", chunk_size=2)] == [*ids[:2], *ids[3:], late.id][::-1]
+    dal.close()
+
+def test_iter_tickets_validates_eagerly(dal: TitanHelpDAL):
+    with pytest.raises(ValueError, match="Sort must be"):
+        dal.iter_tickets(sort="name; DROP TABLE tickets")
+    with pytest.raises(ValueError):
+        dal.iter_tickets(status="Reopened")
+    with pytest.raises(ValueError, match="Invalid date"):
+        dal.iter_tickets(created_since="last tuesday")
+
+def test_iter_tickets_closed_early_returns_connection(dal: TitanHelpDAL):
+    for i in range(5):
+        dal.create_ticket(f"T{i}", "desc")
+    it = dal.iter_tickets(chunk_size=1)
+    next(it)
+    it.close()
+    assert dal.pool_stats().in_use == 0
+
+def test_created_date_filters(dal: TitanHelpDAL):
+    from datetime import date
+    with dal._connect() as conn:
+        conn.executemany(
+            "INSERT INTO tickets(name, description, created_at) VALUES (?, 'd', ?)",
+            [("Dec", "2024-12-31 23:59:59"), ("Jan", "2025-01-01 00:00:00"), ("Feb", "2025-02-01 12:00:00")],
+        )
+    assert [t.name for t in dal.list_tickets(created_since="2025-01-01")] == ["Feb", "Jan"]
+    assert [t.name for t in dal.list_tickets(created_before=date(2025, 1, 1))] == ["Dec"]
+    assert [t.name for t in dal.iter_tickets(created_since="2025-01-01", created_before="2025-02-01 12:00:00")] == ["Jan"]
+
+
+# read-through cache
+
+@pytest.fixture
+def cached_dal(db_path: str) -> TitanHelpDAL:
+    dal = TitanHelpDAL(db_path, journal_mode="WAL", synchronous="OFF", cache_size=16)
+    yield dal
+    dal.close()
+
+def test_cache_hits_and_precise_invalidation(cached_dal: TitanHelpDAL):
+    a = cached_dal.create_ticket("A", "first")
+    b = cached_dal.create_ticket("B", "second")
+    cached_dal.get_ticket(a.id)
+    cached_dal.get_ticket(b.id)
+    cached_dal.list_tickets()
+    assert cached_dal.get_ticket(a.id).name == "A"
+    assert cached_dal.cache_stats().hits == 1
+
+    cached_dal.set_status(a.id, "Closed")
+    stats = cached_dal.cache_stats()
+    assert stats.size == 1                       # only get_ticket(b) survives
+    assert cached_dal.get_ticket(a.id).status == "Closed"
+    assert cached_dal.get_ticket(b.id).name == "B"
+    assert cached_dal.cache_stats().hits == 2
+    assert [t.status for t in cached_dal.list_tickets() if t.id == a.id] == ["Closed"]
+
+def test_cache_forgets_misses_when_tickets_are_inserted(cached_dal: TitanHelpDAL):
+    assert cached_dal.get_ticket(1) is None
+    assert cached_dal.create_tickets_bulk([{"name": "Bulk", "description": "desc"}]).inserted == 1
+    assert cached_dal.get_ticket(1).name == "Bulk"
+
+def test_cache_sees_writes_from_another_process(cached_dal: TitanHelpDAL, db_path: str):
+    t = cached_dal.create_ticket("Shared", "desc")
+    assert cached_dal.get_ticket(t.id).priority == "Low"
+    other = TitanHelpDAL(db_path, journal_mode="WAL", synchronous="OFF")
+    other.set_priority(t.id, "High")
+    other.create_ticket("New elsewhere", "desc")
+    other.close()
+    assert cached_dal.get_ticket(t.id).priority == "High"
+    assert len(cached_dal.list_tickets()) == 2
+
+def test_cache_returns_copies(cached_dal: TitanHelpDAL):
+    t = cached_dal.create_ticket("Copy", "desc")
+    first = cached_dal.get_ticket(t.id)
+    first.status = "Closed"
+    assert cached_dal.get_ticket(t.id).status == "Open"
+
+def test_ticket_cache_lru_and_ttl():
+    from titanhelp_dal.cache import TicketCache
+    now = [0.0]
+    cache = TicketCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.sync(0)
+    cache.put("a", 1, 0)
+    cache.put("b", 2, 0)
+    cache.get("a")
+    cache.put("c", 3, 0)                          # evicts least recently used "b"
+    assert cache.get("b") == (False, None)
+    now[0] = 11
+    assert cache.get("a") == (False, None)        # expired
+    cache.put("d", 4, generation=99)              # read under a stale generation
+    assert cache.get("d") == (False, None)
+    stats = cache.stats()
+    assert (stats.evictions, stats.expirations, stats.hits) == (1, 1, 1)
+
+
+# statistics
+
+def test_stats_follow_inserts_updates_and_deletes(dal: TitanHelpDAL):
+    a = dal.create_ticket("A", "d", priority="High")
+    b = dal.create_ticket("B", "d", priority="High")
+    dal.create_ticket("C", "d")
+    dal.set_status(a.id, "Closed")
+    dal.set_priority(b.id, "Medium")
+    dal.delete_ticket(b.id)
+    dal.create_tickets_bulk([{"name": "D", "description": "d", "status": "In Progress"}])
+    stats = dal.stats()
+    assert stats.total == 3
+    assert stats.by_status == {"Open": 1, "In Progress": 1, "Closed": 1}
+    assert stats.by_priority == {"Low": 2, "Medium": 0, "High": 1}
+    assert stats.by_status_priority[("Closed", "High")] == 1
+    assert stats.open_by_age["Today"] == 2
+    assert dal.check_stats() == []
+
+def test_stats_age_buckets_and_rebuild(dal: TitanHelpDAL):
+    from datetime import datetime, timedelta, timezone
+    today = datetime.now(timezone.utc)
+    with dal._connect() as conn:
+        for days, status in ((3, "Open"), (10, "In Progress"), (45, "Open"), (45, "Closed")):
+            ts = (today - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+            conn.execute("INSERT INTO tickets(name, description, status, created_at) VALUES ('x', 'd', ?, ?)", (status, ts))
+    assert dal.stats().open_by_age == {"Today": 0, "1-6 days": 1, "7-29 days": 1, "30+ days": 1}
+
+    with dal._connect() as conn:
+        conn.execute("UPDATE ticket_counts SET n = 99")
+    assert dal.check_stats()
+    dal.rebuild_stats()
+    assert dal.check_stats() == []
+    assert dal.stats().total == 4
+
+
+# group commit
+
+def test_group_commit_batches_concurrent_creates(db_path: str):
+    from concurrent.futures import ThreadPoolExecutor
+    dal = TitanHelpDAL(db_path, synchronous="FULL", group_commit=True, group_commit_max_wait=0.01)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        tickets = list(pool.map(lambda i: dal.create_ticket(f"T{i}", "burst", priority="High"), range(200)))
+    assert len({t.id for t in tickets}) == 200
+    assert all(t.name == f"T{i}" and t.priority == "High" for i, t in enumerate(tickets))
+    assert len(dal.list_tickets(limit=1000)) == 200
+    stats = dal.group_commit_stats()
+    assert stats.items == 200
+    assert stats.batches < 200
+    dal.close()
+
+def test_group_commit_failure_only_affects_its_caller(db_path: str):
+    import sqlite3
+    dal = TitanHelpDAL(db_path, group_commit=True)
+    results = dal._create_batch([("ok", "d", "Low"), ("x" * 101, "d", "Low"), ("ok2", "d", "Low")])
+    assert isinstance(results[1], sqlite3.IntegrityError)
+    with pytest.raises(sqlite3.IntegrityError):
+        dal._writer.submit(("x" * 101, "d", "Low"))
+    assert dal.create_ticket("after", "error").id is not None
+    assert sorted(t.name for t in dal.list_tickets()) == ["after", "ok", "ok2"]
+    dal.close()
+
+def test_group_commit_returns_rows_as_stored(db_path: str):
+    import sqlite3
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(LEGACY_SCHEMA)
+    dal = TitanHelpDAL(db_path, group_commit=True)
+    with dal._connect() as conn:
+        # an insert trigger rewriting the new row: RETURNING would not see its change
+        conn.execute(
+            "CREATE TRIGGER test_escalate AFTER INSERT ON tickets WHEN new.name LIKE 'urgent%' BEGIN "
+            "UPDATE tickets SET priority = 'High' WHERE id = new.id; END"
+        )
+    results = dal._create_batch([("Urgent: server down", "d", "Low"), ("x" * 101, "d", "Low"), ("Mouse", "d", "Low")])
+    assert isinstance(results[1], sqlite3.IntegrityError)
+    for t in (results[0], results[2], dal.create_ticket("Keyboard", "d")):
+        assert t == dal.get_ticket(t.id)
+        assert ISO_TIMESTAMP_RX.match(t.created_at)
+    assert (results[0].priority, results[0].version) == ("High", 2)
+    dal.close()
+
+
+# atomic close and bulk updates
+
+def test_close_ticket_outcomes(dal: TitanHelpDAL):
+    from titanhelp_dal.dal import CLOSED, ALREADY_CLOSED, NOT_FOUND
+    t = dal.create_ticket("Close me", "desc")
+    first = dal.close_ticket(t.id)
+    assert first.outcome == CLOSED and first.ticket.status == "Closed"
+    second = dal.close_ticket(t.id)
+    assert second.outcome == ALREADY_CLOSED and second.ticket.id == t.id
+    assert dal.close_ticket(999999) == type(first)(NOT_FOUND, None)
+
+def test_concurrent_closes_only_one_wins(db_path: str):
+    from concurrent.futures import ThreadPoolExecutor
+    from titanhelp_dal.dal import CLOSED
+    dal = TitanHelpDAL(db_path, pool_size=8)
+    t = dal.create_ticket("Race", "desc")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outcomes = list(pool.map(lambda _: dal.close_ticket(t.id).outcome, range(8)))
+    assert outcomes.count(CLOSED) == 1
+    dal.close()
+
+def test_update_many_in_one_transaction(dal: TitanHelpDAL):
+    ids = [dal.create_ticket(f"Dup {i}", "outage").id for i in range(1200)]
+    dal.set_status(ids[0], "Closed")
+    changed = dal.set_status_many(ids + [999999], "Closed")
+    assert changed == ids[1:]
+    assert dal.stats().by_status["Closed"] == 1200
+    assert dal.update_many(ids[:3], priority="High", status="Open") == ids[:3]
+    assert dal.update_many([], status="Open") == []
+    with pytest.raises(ValueError):
+        dal.set_priority_many(ids, "Urgent")
+
+
+# asyncio DAL
+
+def test_async_dal_crud(db_path: str):
+    import asyncio
+    from titanhelp_dal.aio import AsyncTitanHelpDAL
+
+    async def scenario():
+        async with AsyncTitanHelpDAL(db_path, journal_mode="WAL", synchronous="OFF") as adal:
+            t = await adal.create_ticket("Async", "desc", priority="Medium")
+            assert (await adal.get_ticket(t.id)).priority == "Medium"
+            assert (await adal.set_status(t.id, "In Progress")).status == "In Progress"
+            assert [x.id for x in await adal.list_tickets(status="In Progress")] == [t.id]
+            assert (await adal.close_ticket(t.id)).ticket.status == "Closed"
+            _age_ticket(adal.dal, t.id, 100)
+            assert adal.dal.archive_closed(90) == 1
+            assert await adal.get_ticket(t.id) is None
+            assert (await adal.get_ticket(t.id, include_archived=True)).name == "Async"
+            kept = await adal.create_ticket("Kept", "desc")
+            assert await adal.delete_ticket(kept.id) is True
+            assert await adal.get_ticket(kept.id) is None
+            with pytest.raises(ValueError):
+                await adal.create_ticket("", "desc")
+
+    asyncio.run(scenario())
+
+def test_async_dal_thousands_of_concurrent_reads(db_path: str):
+    import asyncio
+    import threading
+    from titanhelp_dal.aio import AsyncTitanHelpDAL
+
+    async def scenario():
+        async with AsyncTitanHelpDAL(db_path, journal_mode="WAL", synchronous="OFF", pool_size=8) as adal:
+            ids = [(await adal.create_ticket(f"T{i}", "desc")).id for i in range(50)]
+            release = threading.Event()
+            # park one reader thread and the writer thread on something slow
+            stuck_read = asyncio.ensure_future(adal._run(adal._readers, release.wait))
+            stuck_write = asyncio.ensure_future(adal._run(adal._writer, release.wait))
+            queued_write = asyncio.ensure_future(adal.create_ticket("Queued", "desc"))
+
+            reads = [adal.get_ticket(ids[i % len(ids)]) for i in range(3000)]
+            reads += [adal.list_tickets(limit=10) for _ in range(200)]
+            results = await asyncio.wait_for(asyncio.gather(*reads), timeout=30)
+            assert all(r is not None for r in results[:3000])
+            assert all(len(r) == 10 for r in results[3000:])
+            assert not stuck_read.done() and not queued_write.done()
+
+            release.set()
+            await asyncio.gather(stuck_read, stuck_write)
+            assert (await queued_write).name == "Queued"
+
+    asyncio.run(scenario())
+
+
+# instrumentation
+
+def test_metrics_time_calls_statements_and_errors(db_path: str, caplog):
+    from titanhelp_dal.metrics import Metrics
+
+    metrics = Metrics(slow_query_threshold=0.0)
+    dal = TitanHelpDAL(db_path, journal_mode="DELETE", synchronous="OFF", metrics=metrics)
+    t = dal.create_ticket("Timed", "desc")
+    dal.get_ticket(t.id)
+    dal.get_ticket(t.id)
+    dal.data_version()
+    with pytest.raises(ValueError):
+        dal.list_tickets(status="Reopened")
+    dal.close()
+
+    assert metrics.histogram("titanhelp_dal_call_seconds", (("method", "get_ticket"),)).count == 2
+    assert metrics.histogram("titanhelp_dal_call_seconds", (("method", "data_version"),)).count == 1
+    assert metrics.counter("titanhelp_dal_errors_total", (("method", "list_tickets"), ("error", "ValueError"))) == 1
+    # the INSERT fires the FTS, change-counter and stats triggers
+    assert metrics.counter("titanhelp_sqlite_statements_total", (("kind", "trigger"),)) >= 3
+    assert any(q.sql.startswith("SELECT * FROM tickets WHERE id = ?") for q in metrics.slow_queries())
+    assert "slow query" in caplog.text and "Timed" not in caplog.text   # parameters are never logged
+
+    text = metrics.render()
+    assert '# TYPE titanhelp_dal_call_seconds histogram' in text
+    assert 'titanhelp_dal_call_seconds_count{method="get_ticket"} 2' in text
+    assert 'titanhelp_dal_call_seconds_bucket{method="get_ticket",le="+Inf"} 2' in text
+    assert "titanhelp_pool_connections_opened_total 1" in text
+
+def test_metrics_count_busy_errors(db_path: str):
+    import sqlite3
+    from titanhelp_dal.metrics import Metrics
+
+    metrics = Metrics()
+    dal = TitanHelpDAL(db_path, journal_mode="WAL", synchronous="OFF", metrics=metrics)
+    blocker = sqlite3.connect(db_path, timeout=0)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        with dal._pool.connection() as conn:
+            conn.execute("PRAGMA busy_timeout = 0")
+        with pytest.raises(sqlite3.OperationalError):
+            dal.create_ticket("Blocked", "desc")
+    finally:
+        blocker.rollback()
+        blocker.close()
+        dal.close()
+    assert metrics.counter("titanhelp_sqlite_busy_total", (("method", "create_ticket"),)) == 1
+
+def test_metrics_off_uses_plain_connections(dal: TitanHelpDAL):
+    import sqlite3
+    with dal._pool.connection() as conn:
+        assert type(conn) is sqlite3.Connection
+
+
+# data versions
+
+def test_versions_follow_updates_but_not_reads(dal: TitanHelpDAL):
+    t = dal.create_ticket("Versioned", "desc")
+    other = dal.create_ticket("Other", "desc")
+    assert (t.version, t.updated_at) == (1, None)
+    before = dal.data_version()
+    dal.get_ticket(t.id)
+    dal.list_tickets()
+    assert dal.data_version() == before
+    assert dal.set_status(t.id, "In Progress").version == 2
+    assert dal.close_ticket(t.id).ticket.version == 3
+    dal.update_many([t.id, other.id], priority="High")
+    assert dal.ticket_version(t.id).version == 4
+    assert dal.ticket_version(other.id).version == 2
+    assert dal.data_version().seq > before.seq
+    assert ISO_TIMESTAMP_RX.match(dal.ticket_version(t.id).modified_at)
+    assert dal.ticket_version(999) is None
+
+def test_version_bumped_for_writes_outside_the_dal(dal: TitanHelpDAL, db_path: str):
+    import sqlite3
+    t = dal.create_ticket("Raw", "desc")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE tickets SET name = 'Raw SQL' WHERE id = ?", (t.id,))
+    updated = dal.get_ticket(t.id)
+    assert updated.version == 2 and updated.updated_at is not None
+
+
+# listing summaries
+
+def test_summary_listing_previews_description(dal: TitanHelpDAL, cached_dal: TitanHelpDAL):
+    from titanhelp_dal.dal import PREVIEW_CHARS, TicketSummary
+    for d in (dal, cached_dal):
+        long = d.create_ticket("Long", "x" * 900, priority="High")
+        short = d.create_ticket("Short", "brief")
+        rows = [r for r in d.list_tickets(summary=True, sort="id") if r.id in (long.id, short.id)]
+        assert all(isinstance(r, TicketSummary) for r in rows)
+        assert [r.id for r in rows] == [long.id, short.id]
+        assert rows[0].preview == "x" * PREVIEW_CHARS and rows[0].truncated
+        assert rows[0].description_length == 900
+        assert (rows[0].priority, rows[0].status, rows[0].created_at) == ("High", "Open", long.created_at)
+        assert rows[1].preview == "brief" and not rows[1].truncated
+        assert rows[0].date == long.date
+        assert short.id in [r.id for r in d.list_tickets(summary=True, search="brief")]
+
+def test_summary_pages_share_cursors(dal: TitanHelpDAL):
+    for i in range(5):
+        dal.create_ticket(f"T{i}", "desc")
+    full = dal.page_tickets(limit=2)
+    lean = dal.page_tickets(limit=2, summary=True)
+    assert [t.id for t in full.tickets] == [t.id for t in lean.tickets]
+    assert full.next_cursor == lean.next_cursor
+    nxt = dal.page_tickets(limit=2, cursor=lean.next_cursor, summary=True)
+    assert [t.id for t in nxt.tickets] == [t.id for t in dal.page_tickets(limit=2, cursor=full.next_cursor).tickets]
+
+
+# archive
+
+def _age_ticket(dal: TitanHelpDAL, ticket_id: int, days: int) -> None:
+    with dal._connect() as conn:
+        conn.execute(
+            "UPDATE tickets SET version = version + 1, updated_at = datetime('now', ?) WHERE id = ?",
+            (f"-{days} days", ticket_id),
+        )
+
+def test_archive_moves_only_long_closed_tickets_in_batches(dal: TitanHelpDAL):
+    old = [dal.create_ticket(f"Old {i}", "printer jam") for i in range(5)]
+    recent = dal.create_ticket("Recent", "printer jam")
+    open_old = dal.create_ticket("Still open", "printer jam")
+    for t in old + [recent]:
+        dal.close_ticket(t.id)
+    for t in old + [open_old]:
+        _age_ticket(dal, t.id, 100)
+    before = dal.stats()
+
+    assert dal.archive_closed(90, batch_size=2) == 5
+    assert dal.archive_closed(90) == 0
+    assert dal.archived_count() == 5
+    assert dal.get_ticket(old[0].id) is None
+    archived = dal.get_ticket(old[0].id, include_archived=True)
+    assert (archived.name, archived.status) == ("Old 0", "Closed")
+    assert dal.get_ticket(recent.id, include_archived=True).name == "Recent"
+    assert {t.id for t in dal.list_tickets()} == {recent.id, open_old.id}
+    assert [t.name for t in dal.list_tickets(search="printer")] != []
+    assert all(not t.name.startswith("Old") for t in dal.list_tickets(search="printer"))
+    # statistics still count archived tickets
+    assert dal.stats() == before
+    assert dal.check_stats() == []
+
+def test_list_tickets_include_archived(dal: TitanHelpDAL):
+    from titanhelp_dal.dal import TicketSummary
+    gone = dal.create_ticket("Archived jam", "paper jam in tray 2")
+    live = dal.create_ticket("Live jam", "paper jam again")
+    dal.close_ticket(gone.id)
+    _age_ticket(dal, gone.id, 200)
+    dal.archive_closed(30)
+
+    names = [t.name for t in dal.list_tickets(include_archived=True, sort="id")]
+    assert names == ["Archived jam", "Live jam"]
+    assert [t.name for t in dal.list_tickets(include_archived=True, status="Closed")] == ["Archived jam"]
+    ranked = dal.list_tickets(search="jam", sort="rank", include_archived=True)
+    assert [t.id for t in ranked] == [live.id, gone.id]
+    lean = dal.list_tickets(include_archived=True, summary=True, sort="id", limit=1, offset=1)
+    assert isinstance(lean[0], TicketSummary) and lean[0].id == live.id
+
+def test_archive_cli(db_path: str, capsys):
+    from titanhelp_dal.__main__ import main
+    dal = TitanHelpDAL(db_path)
+    t = dal.create_ticket("Done", "desc")
+    dal.close_ticket(t.id)
+    _age_ticket(dal, t.id, 10)
+    dal.close()
+    assert main(["--db", db_path, "archive", "--days", "7"]) == 0
+    assert "Archived 1 tickets" in capsys.readouterr().out
+
+
+# change log and live feed
+
+def test_change_log_records_inserts_edits_and_deletes(dal: TitanHelpDAL):
+    start = dal.latest_change_seq()
+    t = dal.create_ticket("Logged", "desc")
+    dal.set_status(t.id, "In Progress")
+    with dal._connect() as conn:     # version-only bumps are not user-visible changes
+        conn.execute("UPDATE tickets SET version = version + 1 WHERE id = ?", (t.id,))
+    dal.delete_ticket(t.id)
+    changes = dal.changes_since(start)
+    assert [(c.ticket_id, c.op, c.status) for c in changes] == [
+        (t.id, "insert", "Open"), (t.id, "update", "In Progress"), (t.id, "delete", "In Progress"),
+    ]
+    assert [c.seq for c in dal.changes_since(changes[0].seq, limit=1)] == [changes[1].seq]
+    assert dal.latest_change_seq() == changes[-1].seq
+    assert changes[0].to_dict()["op"] == "insert"
+
+def test_change_log_prunes_old_entries(dal: TitanHelpDAL):
+    from titanhelp_dal.migrations import CHANGE_LOG_RETENTION
+    dal.create_ticket("Early", "desc")
+    with dal._connect() as conn:
+        conn.execute(
+            "INSERT INTO ticket_changes(seq, ticket_id, op) VALUES (?, 0, 'update')", (CHANGE_LOG_RETENTION + 1000,)
+        )
+    assert dal.oldest_change_seq() == CHANGE_LOG_RETENTION + 1000
+
+def test_change_feed_one_poller_fans_out(dal: TitanHelpDAL):
+    import threading
+    from titanhelp_dal.feed import ChangeFeed
+
+    feed = ChangeFeed(dal, interval=0.05)
+    head = feed.head()
+    results = []
+    lock = threading.Lock()
+
+    def subscriber():
+        found = feed.wait(head, timeout=5)
+        with lock:
+            results.append(found)
+
+    threads = [threading.Thread(target=subscriber) for _ in range(25)]
+    for th in threads:
+        th.start()
+    t = dal.create_ticket("Broadcast", "desc")
+    for th in threads:
+        th.join()
+    polls = feed.stats().polls
+    assert len(results) == 25
+    assert all([c.ticket_id for c in r] == [t.id] for r in results)
+    assert polls < 25                              # shared, not one query per subscriber
+    feed.close()
+    assert feed.wait(feed.head(), timeout=5) == []   # a closed feed never blocks
+
+def test_change_feed_reports_readers_that_fell_behind(dal: TitanHelpDAL):
+    from titanhelp_dal.feed import ChangeFeed
+    for i in range(5):
+        dal.create_ticket(f"T{i}", "desc")
+    feed = ChangeFeed(dal, interval=0.05, backlog=2)
+    head = feed.head()
+    assert [c.seq for c in feed.wait(head - 2, timeout=0)] == [head - 1, head]
+    assert feed.wait(head - 3, timeout=0) is None
+    feed.close()
+
+
+# database maintenance
+
+def _fill_and_empty(dal: TitanHelpDAL, n: int = 400) -> None:
+    dal.create_tickets_bulk({"name": f"T{i}", "description": "x" * 900} for i in range(n))
+    with dal._connect() as conn:
+        conn.execute("DELETE FROM tickets")
+
+def test_new_databases_release_free_pages_incrementally(db_path: str):
+    from titanhelp_dal.maintenance import run_maintenance
+    dal = TitanHelpDAL(db_path)
+    _fill_and_empty(dal)
+    before = dal.database_info()
+    assert before.auto_vacuum == "INCREMENTAL"
+    assert before.freelist_count > 100
+    assert dal.incremental_vacuum(10) == 10
+    report = run_maintenance(dal, ["vacuum"], vacuum_pages=50)
+    assert report.ok and report.runs[0].task == "vacuum"
+    assert report.after.freelist_count == 0
+    assert report.after.page_count == before.page_count - before.freelist_count
+    dal.close()
+
+def test_checkpoint_truncates_wal_but_never_waits_long(db_path: str):
+    import sqlite3
+    import time
+    dal = TitanHelpDAL(db_path)
+    dal.create_ticket("WAL", "desc")
+    assert dal.database_info().wal_bytes > 0
+    result = dal.checkpoint()
+    assert not result.busy and result.checkpointed == result.wal_pages > 0
+    assert dal.database_info().wal_bytes == 0
+
+    dal.create_ticket("Reader pins the WAL", "desc")
+    reader = sqlite3.connect(db_path, isolation_level=None)
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM tickets").fetchone()
+    dal.create_ticket("After the snapshot", "desc")
+    started = time.perf_counter()
+    result = dal.checkpoint("TRUNCATE", busy_timeout=0.05)
+    assert result.busy and time.perf_counter() - started < 1
+    assert dal.create_ticket("Writers still go through", "desc").id
+    reader.close()
+    dal.close()
+
+def test_old_databases_skip_vacuum_until_converted(dal: TitanHelpDAL):
+    from titanhelp_dal.maintenance import run_maintenance
+    dal.vacuum(incremental=False)
+    _fill_and_empty(dal, 100)
+    report = run_maintenance(dal)
+    assert [r.task for r in report.runs] == ["analyze", "vacuum", "checkpoint"]
+    assert report.runs[1].detail.startswith("skipped: auto_vacuum is NONE")
+    assert report.runs[2].detail == "skipped: not in WAL mode"
+    dal.vacuum()
+    info = dal.database_info()
+    assert info.auto_vacuum == "INCREMENTAL" and info.freelist_count == 0
+    with dal._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) AS n FROM sqlite_stat1").fetchone()["n"] > 0
+
+def test_scheduler_runs_due_tasks_only_when_idle(db_path: str):
+    import time
+    from titanhelp_dal.maintenance import MaintenanceScheduler
+    from titanhelp_dal.metrics import Metrics
+    metrics = Metrics()
+    dal = TitanHelpDAL(db_path)
+    _fill_and_empty(dal, 50)
+    scheduler = MaintenanceScheduler(
+        dal, checkpoint_every=0.05, analyze_every=0.05, vacuum_every=None,
+        idle_for=0.3, poll_interval=0.02, metrics=metrics,
+    )
+    scheduler.start()
+    busy_until = time.monotonic() + 0.6
+    while time.monotonic() < busy_until:
+        dal.create_ticket("Busy", "desc")
+        time.sleep(0.02)
+    assert scheduler.stats().runs["checkpoint"] == 0
+    deadline = time.monotonic() + 5
+    while scheduler.stats().runs["checkpoint"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    scheduler.close()
+    stats = scheduler.stats()
+    assert stats.runs["checkpoint"] >= 1 and stats.runs["analyze"] >= 1 and stats.runs["vacuum"] == 0
+    assert stats.failures == {"analyze": 0, "vacuum": 0, "checkpoint": 0}
+    assert stats.database.wal_bytes == 0
+    text = metrics.render()
+    assert 'titanhelp_maintenance_seconds_count{task="checkpoint"}' in text
+    assert "titanhelp_db_wal_bytes 0" in text
+    dal.close()
+
+def test_scheduler_is_not_kept_busy_by_live_feed_readers(db_path: str):
+    import threading
+    import time
+    from titanhelp_dal.feed import ChangeFeed
+    from titanhelp_dal.maintenance import MaintenanceScheduler
+    dal = TitanHelpDAL(db_path)
+    _fill_and_empty(dal, 50)
+    feed = ChangeFeed(dal, interval=0.05)
+    done = threading.Event()
+
+    def subscriber():
+        seq = feed.head()
+        while not done.is_set():
+            seq = max([seq, *(c.seq for c in feed.wait(seq, 0.2) or ())])
+
+    reader = threading.Thread(target=subscriber)
+    reader.start()
+    scheduler = MaintenanceScheduler(
+        dal, checkpoint_every=0.05, analyze_every=None, vacuum_every=None, idle_for=0.3, poll_interval=0.02,
+    )
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 5
+        while scheduler.stats().runs["checkpoint"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert feed.stats().polls > 0
+        assert scheduler.stats().runs["checkpoint"] >= 1
+    finally:
+        scheduler.close()
+        done.set()
+        reader.join()
+        feed.close()
+        dal.close()
+
+def test_maintain_cli(db_path: str, capsys):
+    from titanhelp_dal.__main__ import main
+    dal = TitanHelpDAL(db_path)
+    _fill_and_empty(dal, 100)
+    dal.close()
+    assert main(["--db", db_path, "maintain"]) == 0
+    out = capsys.readouterr().out
+    assert "TRUNCATE:" in out and "released" in out and "After:" in out
+    assert main(["--db", db_path, "maintain", "--tasks", "checkpoint", "--json"]) == 0
+    import json
+    report = json.loads(capsys.readouterr().out)
+    assert [r["task"] for r in report["runs"]] == ["checkpoint"]
+    assert report["after"]["freelist_count"] == 0
+
+
+# write contention
+
+def _hold_write_lock(db_path: str, seconds: float):
+    import sqlite3
+    import threading
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    conn.execute("BEGIN IMMEDIATE")
+    timer = threading.Timer(seconds, lambda: (conn.execute("COMMIT"), conn.close()))
+    timer.start()
+    return timer
+
+def test_locked_writes_retry_with_backoff(db_path: str):
+    dal = TitanHelpDAL(db_path, busy_timeout=0.01, write_retries=50, retry_backoff=0.005, retry_backoff_max=0.02)
+    timer = _hold_write_lock(db_path, 0.2)
+    t = dal.create_ticket("Patient", "Waited for the lock")
+    timer.join()
+    stats = dal.contention_stats()
+    assert dal.get_ticket(t.id).name == "Patient"
+    assert stats.retries > 0 and stats.failures == 0
+    assert stats.max_lock_wait >= 0.15
+    dal.close()
+
+def test_locked_writes_give_up_after_retries(db_path: str):
+    import sqlite3
+    dal = TitanHelpDAL(db_path, busy_timeout=0.01, write_retries=2, retry_backoff=0.001)
+    before = dal.contention_stats().transactions
+    timer = _hold_write_lock(db_path, 0.5)
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        dal.create_ticket("Impatient", "Gave up")
+    timer.join()
+    stats = dal.contention_stats()
+    assert (stats.transactions - before, stats.retries, stats.failures) == (1, 2, 1)
+    assert dal.list_tickets(search="Impatient") == []
+    dal.close()
+
+def _stress_writer(args):
+    # one process writing at `rate` writes/s: three creates, then an update of the last one
+    import sqlite3
+    import time
+    db_path, worker, writes, rate = args
+    dal = TitanHelpDAL(db_path, busy_timeout=0.02, write_retries=100, retry_backoff=0.002, retry_backoff_max=0.05)
+    created, updated, failed = [], [], 0
+    start = time.monotonic()
+    for i in range(writes):
+        delay = start + i / rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            if i % 4 == 3:
+                updated.append(dal.update_ticket(created[-1], status="In Progress").id)
+            else:
+                created.append(dal.create_ticket(f"w{worker}-{i}", "stress").id)
+        except sqlite3.Error:
+            failed += 1
+    stats = dal.contention_stats()
+    dal.close()
+    return created, updated, failed, stats.retries, time.monotonic() - start
+
+def _open_at(args):
+    # one worker process opening the database at a shared wall-clock moment
+    import time
+    db_path, start_at = args
+    time.sleep(max(start_at - time.time(), 0))
+    try:
+        dal = TitanHelpDAL(db_path)
+        dal.create_ticket("Booted", "desc")
+        dal.close()
+        return None
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+def test_workers_migrating_one_database_at_once(tmp_path: Path):
+    import multiprocessing
+    import sqlite3
+    import time
+    from titanhelp_dal.migrations import SCHEMA_VERSION
+    workers = 8
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        for round in range(6):
+            path = str(tmp_path / f"race{round}.db")
+            legacy = round % 2 == 1
+            if legacy:
+                with sqlite3.connect(path) as conn:
+                    conn.execute(LEGACY_SCHEMA)
+                    conn.executemany(
+                        "INSERT INTO tickets(name, description, created_at) VALUES (?, 'd', ?)",
+                        [(f"Old {i}", f"01-{i + 1:02d}-2025 09:00:00") for i in range(20)],
+                    )
+            start_at = time.time() + 0.3
+            errors = pool.map(_open_at, [(path, start_at)] * workers, chunksize=1)
+            assert errors == [None] * workers
+            dal = TitanHelpDAL(path)
+            assert dal.schema_version() == SCHEMA_VERSION
+            tickets = list(dal.iter_tickets())
+            assert len(tickets) == workers + (20 if legacy else 0)
+            assert all(ISO_TIMESTAMP_RX.match(t.created_at) for t in tickets)
+            assert dal.check_stats() == []
+            dal.close()
+
+def test_multi_process_writes_are_never_lost(db_path: str):
+    import multiprocessing
+    import time
+    workers, writes, rate = 4, 200, 250      # 1,000 writes/s in total; the workers also create the schema
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(workers) as pool:
+        results = pool.map(_stress_writer, [(db_path, w, writes, rate) for w in range(workers)])
+    assert [failed for _, _, failed, _, _ in results] == [0] * workers
+    created = [i for r in results for i in r[0]]
+    updated = {i for r in results for i in r[1]}
+    dal = TitanHelpDAL(db_path)
+    tickets = {t.id: t for t in dal.iter_tickets()}
+    assert len(created) == len(set(created)) == workers * writes * 3 // 4
+    assert set(tickets) == set(created)
+    assert {t.name for t in tickets.values()} == {f"w{w}-{i}" for w in range(workers) for i in range(writes) if i % 4 != 3}
+    assert {i for i, t in tickets.items() if t.status == "In Progress"} == updated
+    assert len(updated) == workers * writes // 4
+    assert dal.check_stats() == []
+    # every writer kept up with its target rate (spawning processes is the slow part)
+    assert max(r[4] for r in results) < writes / rate * 2
+    dal.close()
@@ -1,6 +1,17 @@
+import os
+import sqlite3
+import tempfile
 import unittest
-from app import app, dal
+from unittest import mock
+import time
+from app import create_app
 import json
+from werkzeug.http import http_date
+
+# one in-memory database for the whole module, shared by the app and the tests
+app = create_app({"TESTING": True, "DATABASE": ":memory:", "LIVE_INTERVAL": 0.05})
+state = app.extensions["titanhelp"]
+dal, feed, metrics = state.dal, state.feed, state.metrics
 
 with open ("tests/test_data.json") as f:
     d = json.load(f)
@@ -82,5 +93,248 @@ class TestTickets(unittest.TestCase):
                     self.assertEqual(response.status_code, 200)
                     self.assertIn(">Ticket has been successfully closed</div>", response.get_data(as_text=True))
 
+    def test_search_tickets(self):
+        with app.test_client() as c:
+            c.post("/new-ticket", data={"name":"Searchable Ticket", "description":"Zyxwvut keyboard fell off the desk","priority":'Low'})
+            response = c.get("/?q=zyxw")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("Searchable Ticket", response.get_data(as_text=True))
+            response = c.get("/?q=%22keyboard+zyxwvut%22")
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("Searchable Ticket", response.get_data(as_text=True))
+
+    def test_home_pagination(self):
+        with app.test_client() as c:
+            response = c.get("/?cursor=garbage")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("Invalid page cursor", response.get_data(as_text=True))
+            page = dal.page_tickets(limit=1)
+            if page.next_cursor:
+                response = c.get(f"/?cursor={page.next_cursor}")
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("Newer", response.get_data(as_text=True))
+
+    def test_export_csv_and_jsonl(self):
+        with app.test_client() as c:
+            c.post("/new-ticket", data={"name":"Exported Ticket", "description":"Goes out in the export","priority":'Medium'})
+            response = c.get("/export.csv?priority=Medium")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, "text/csv")
+            lines = response.get_data(as_text=True).splitlines()
+            self.assertEqual(lines[0], "id,name,description,status,priority,created_at")
+            self.assertTrue(any("Exported Ticket" in line for line in lines[1:]))
+
+            response = c.get("/export.jsonl?priority=Medium")
+            self.assertEqual(response.status_code, 200)
+            rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            self.assertTrue(rows)
+            self.assertTrue(all(r["priority"] == "Medium" for r in rows))
+
+            response = c.get("/export.csv?status=Reopened")
+            self.assertEqual(response.status_code, 400)
+
+    def test_stats_page_and_json(self):
+        with app.test_client() as c:
+            response = c.get("/stats")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("<h1>Statistics</h1>", response.get_data(as_text=True))
+            response = c.get("/stats.json")
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            self.assertEqual(data["total"], sum(data["by_status"].values()))
+            self.assertEqual(data["total"], len(list(dal.iter_tickets())) + dal.archived_count())
+
+    def test_closing_twice_and_missing(self):
+        with app.test_client() as c:
+            t = dal.create_ticket("Double Close", "Closed twice")
+            response = c.post(f"/ticket/{t.id}/close")
+            self.assertEqual(response.status_code, 200)
+            response = c.post(f"/ticket/{t.id}/close")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("Ticket has already been closed.", response.get_data(as_text=True))
+            response = c.post("/ticket/99999999/close")
+            self.assertEqual(response.status_code, 404)
+
+    def test_bulk_update(self):
+        with app.test_client() as c:
+            a = dal.create_ticket("Bulk A", "Duplicate")
+            b = dal.create_ticket("Bulk B", "Duplicate")
+            response = c.post("/tickets/bulk", data={"ids": [a.id, b.id], "status": "Closed", "priority": "High"})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("Updated 2 of 2 selected tickets", response.get_data(as_text=True))
+            self.assertEqual(dal.get_ticket(a.id).status, "Closed")
+            self.assertEqual(dal.get_ticket(b.id).priority, "High")
+            response = c.post("/tickets/bulk", data={"status": "Closed"})
+            self.assertEqual(response.status_code, 400)
+            response = c.post("/tickets/bulk", data={"ids": [a.id], "status": "Reopened"})
+            self.assertEqual(response.status_code, 400)
+
+    def test_metrics_endpoint(self):
+        with app.test_client() as c:
+            c.get("/")
+            c.get("/ticket/99999999")
+            response = c.get("/metrics")
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.content_type.startswith("text/plain"))
+            text = response.get_data(as_text=True)
+            self.assertIn('titanhelp_http_request_seconds_count{route="/",method="GET",status="200"}', text)
+            self.assertIn('route="/ticket/<int:ticket_id>",method="GET",status="404"', text)
+            self.assertIn('titanhelp_dal_call_seconds_count{method="page_tickets"}', text)
+            self.assertIn("titanhelp_pool_connections_opened_total", text)
+            self.assertIn("titanhelp_cache_hits_total", text)
+
+    def dal_calls(self, method):
+        hist = metrics.histogram("titanhelp_dal_call_seconds", (("method", method),))
+        return hist.count if hist else 0
+
+    def test_index_conditional_get(self):
+        with app.test_client() as c:
+            response = c.get("/")
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers["ETag"]
+
+            pages = self.dal_calls("page_tickets")
+            response = c.get("/", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.get_data(), b"")
+            self.assertEqual(self.dal_calls("page_tickets"), pages)
+
+            dal.create_ticket("Fresh", "Changes the list")
+            response = c.get("/", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_ticket_conditional_get(self):
+        with app.test_client() as c:
+            t = dal.create_ticket("Polled", "Watched by a dashboard")
+            response = c.get(f"/ticket/{t.id}")
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers["ETag"]
+
+            gets = self.dal_calls("get_ticket")
+            response = c.get(f"/ticket/{t.id}", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            # another ticket changed: revalidated by version, still no row read
+            dal.create_ticket("Unrelated", "Other ticket")
+            response = c.get(f"/ticket/{t.id}", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(self.dal_calls("get_ticket"), gets)
+
+            dal.set_priority(t.id, "High")
+            response = c.get(f"/ticket/{t.id}", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("High", response.get_data(as_text=True))
+
+            # changed this second: another change in it would keep the same date
+            self.assertNotIn("Last-Modified", response.headers)
+            time.sleep(1.1)
+            response = c.get(f"/ticket/{t.id}")
+            response = c.get(f"/ticket/{t.id}", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+            self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_alone_never_hides_a_change(self):
+        with app.test_client() as c:
+            time.sleep(1 - time.time() % 1)     # keep the steps below within one second
+            c.get("/")
+            # what a client holding a Last-Modified from this second would send
+            stamp = http_date(time.time())
+            dal.create_ticket("Same second", "Created right after the list was fetched")
+            response = c.get("/", headers={"If-Modified-Since": stamp})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("Same second", response.get_data(as_text=True))
+            self.assertIsNone(response.last_modified)
+
+            time.sleep(1.1)
+            response = c.get("/")
+            self.assertIsNotNone(response.last_modified)
+            response = c.get("/", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+            self.assertEqual(response.status_code, 304)
+
+    def test_index_shows_description_preview(self):
+        with app.test_client() as c:
+            t = dal.create_ticket("Preview", "word " * 150)
+            html = c.get("/").get_data(as_text=True)
+            self.assertIn("word word", html)
+            self.assertNotIn(("word " * 150).strip(), html)
+            self.assertIn("&hellip;", html)
+            html = c.get(f"/ticket/{t.id}").get_data(as_text=True)
+            self.assertIn(("word " * 150).strip(), html)
+
+    def test_archived_ticket_still_viewable(self):
+        with app.test_client() as c:
+            t = dal.create_ticket("Archived Printer", "Fixed long ago")
+            dal.close_ticket(t.id)
+            with dal._connect() as conn:
+                conn.execute("UPDATE tickets SET version = version + 1, updated_at = datetime('now', '-400 days') WHERE id = ?", (t.id,))
+            self.assertGreaterEqual(dal.archive_closed(365), 1)
+            response = c.get(f"/ticket/{t.id}")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("Archived Printer", response.get_data(as_text=True))
+
+    def test_changes_long_poll(self):
+        with app.test_client() as c:
+            head = c.get("/changes").get_json()["last_seq"]
+            self.assertEqual(head, feed.head())
+            t = dal.create_ticket("Live", "Pushed to pollers")
+            data = c.get(f"/changes?since={head}&timeout=5").get_json()
+            self.assertEqual([(x["ticket_id"], x["op"]) for x in data["changes"]], [(t.id, "insert")])
+            self.assertEqual(data["last_seq"], data["changes"][-1]["seq"])
+            data = c.get(f"/changes?since={data['last_seq']}&timeout=0").get_json()
+            self.assertEqual(data["changes"], [])
+            self.assertEqual(c.get("/changes?since=abc").status_code, 400)
+            for bad in ("nan", "inf", "-inf"):
+                self.assertEqual(c.get(f"/changes?since={head}&timeout={bad}").status_code, 400)
+            started = time.monotonic()
+            self.assertEqual(c.get(f"/changes?since={data['last_seq']}&timeout=-5").get_json()["changes"], [])
+            self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_events_stream(self):
+        with app.test_client() as c:
+            head = feed.head()
+            t = dal.create_ticket("Streamed", "Sent as an event")
+            dal.set_status(t.id, "In Progress")
+            response = c.get("/events", headers={"Last-Event-ID": str(head)}, buffered=False)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.content_type.startswith("text/event-stream"))
+            chunks = iter(response.response)
+            self.assertIn("event: hello", next(chunks).decode())
+            first, second = next(chunks).decode(), next(chunks).decode()
+            response.close()
+            self.assertIn("event: change", first)
+            self.assertEqual(json.loads(first.split("data: ", 1)[1])["ticket_id"], t.id)
+            self.assertEqual(json.loads(second.split("data: ", 1)[1])["status"], "In Progress")
+
+    def test_events_stream_ends_after_live_timeout(self):
+        short = create_app({"TESTING": True, "DATABASE": ":memory:", "LIVE_INTERVAL": 0.05, "LIVE_TIMEOUT": 0.3})
+        with short.test_client() as c:
+            started = time.monotonic()
+            body = c.get("/events").get_data(as_text=True)
+            self.assertLess(time.monotonic() - started, 3.0)
+        self.assertIn("retry: 1000", body)
+        self.assertIn("event: hello", body)
+        short.extensions["titanhelp"].close()
+
+    def test_live_routes_report_database_errors(self):
+        broken = create_app({"TESTING": True, "DATABASE": ":memory:", "METRICS": False})
+        state = broken.extensions["titanhelp"]
+        failure = sqlite3.OperationalError("disk I/O error")
+        with mock.patch.object(state.dal, "latest_change_seq", side_effect=failure), broken.test_client() as c:
+            for url in ("/changes", "/changes?since=0&timeout=0", "/events"):
+                response = c.get(url)
+                self.assertEqual(response.status_code, 500)
+                self.assertIn("disk I/O error", response.get_json()["error"])
+        state.close()
+
+    def test_create_app_opens_database_lazily(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lazy.db")
+            lazy = create_app({"DATABASE": path, "METRICS": False})
+            self.assertFalse(os.path.exists(path))
+            with lazy.test_client() as c:
+                self.assertEqual(c.get("/").status_code, 200)
+                self.assertEqual(c.get("/metrics").status_code, 404)
+            self.assertTrue(os.path.exists(path))
+            lazy.extensions["titanhelp"].close()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,47 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+import bench
+
+
+class TestBench(unittest.TestCase):
+
+    def test_fake_tickets_fit_the_limits(self):
+        tickets = list(bench.fake_tickets(200))
+        self.assertEqual(len(tickets), 200)
+        for t in tickets:
+            self.assertTrue(0 < len(t["name"]) <= 100)
+            self.assertTrue(0 < len(t["description"]) <= 1000)
+
+    def test_small_run_reports_every_benchmark(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report = bench.run([50], n=20, concurrency=2, db_dir=tmp)
+        results = report["results"]["50"]
+        for name in ("get_ticket", "list_tickets_filtered", "list_tickets_search", "create_ticket",
+                     "close_ticket", "GET /", "POST /new-ticket"):
+            self.assertEqual(results[name]["n"], 20)
+            self.assertLessEqual(results[name]["p50_ms"], results[name]["p99_ms"])
+        json.dumps(report)
+
+    def test_compare_flags_regressions_only(self):
+        baseline = {"results": {"1000": {"get_ticket": {"p50_ms": 1.0, "p95_ms": 2.0, "ops_per_s": 1000.0}}}}
+        current = {"results": {"1000": {"get_ticket": {"p50_ms": 1.05, "p95_ms": 3.0, "ops_per_s": 800.0}}}}
+        rows = {r["metric"]: r for r in bench.compare(current, baseline, threshold=0.10)}
+        self.assertFalse(rows["p50_ms"]["regression"])
+        self.assertTrue(rows["p95_ms"]["regression"])
+        self.assertTrue(rows["ops_per_s"]["regression"])
+
+    def test_compare_reads_summarize_output_and_selected_metrics(self):
+        baseline = {"results": {"1000": {"get_ticket": bench.summarize([0.001, 0.002, 0.003], 0.5)}}}
+        current = {"results": {"1000": {"get_ticket": bench.summarize([0.001, 0.002, 0.009], 0.5)}}}
+        rows = bench.compare(current, baseline, threshold=0.10)
+        self.assertEqual({r["metric"] for r in rows}, set(bench.DEFAULT_COMPARE))
+        rows = bench.compare(current, baseline, threshold=0.10, metrics=["p99_ms"])
+        self.assertEqual([(r["metric"], r["regression"]) for r in rows], [("p99_ms", True)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,29 @@
 # titanhelp_dal/__init__.py
 
-from .dal import TitanHelpDAL, Ticket, STATUS_VALUES, PRIORITY_VALUES
+from .dal import (
+    TitanHelpDAL, Ticket, TicketSummary, TicketPage, TicketStats, BulkResult, RowError, CloseResult,
+    DataVersion, TicketVersion, TicketChange, DatabaseInfo, CheckpointResult, ContentionStats,
+    STATUS_VALUES, PRIORITY_VALUES, AGE_BUCKETS, PREVIEW_CHARS, CLOSED, ALREADY_CLOSED, NOT_FOUND,
+)
+from .aio import AsyncTitanHelpDAL
+from .cache import CacheStats, TicketCache
+from .feed import ChangeFeed, ChangeFeedStats
+from .maintenance import MaintenanceReport, MaintenanceScheduler, MaintenanceStats, TaskRun, run_maintenance
+from .metrics import Metrics, SlowQuery
+from .migrations import MIGRATIONS, SCHEMA_VERSION, migrate
+from .pool import ConnectionPool, PoolStats, PoolTimeout
+from .writer import GroupCommitStats, GroupCommitWriter
 
-__all__ = ["TitanHelpDAL", "Ticket", "STATUS_VALUES", "PRIORITY_VALUES"]
\ No newline at end of file
+__all__ = [
+    "TitanHelpDAL", "Ticket", "TicketSummary", "TicketPage", "TicketStats", "BulkResult", "RowError", "CloseResult",
+    "DataVersion", "TicketVersion", "TicketChange", "DatabaseInfo", "CheckpointResult", "ContentionStats",
+    "STATUS_VALUES", "PRIORITY_VALUES", "AGE_BUCKETS", "PREVIEW_CHARS", "CLOSED", "ALREADY_CLOSED", "NOT_FOUND",
+    "AsyncTitanHelpDAL",
+    "CacheStats", "TicketCache",
+    "ChangeFeed", "ChangeFeedStats",
+    "MaintenanceReport", "MaintenanceScheduler", "MaintenanceStats", "TaskRun", "run_maintenance",
+    "Metrics", "SlowQuery",
+    "MIGRATIONS", "SCHEMA_VERSION", "migrate",
+    "ConnectionPool", "PoolStats", "PoolTimeout",
+    "GroupCommitStats", "GroupCommitWriter",
+]
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Command line maintenance for a TitanHelp database.
+
+    python -m titanhelp_dal [--db titanhelp.db] <command>
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import time
+from typing import List, Optional
+
+from .dal import CHECKPOINT_MODES, DatabaseInfo, TitanHelpDAL
+from .importer import FORMATS, guess_format, iter_records
+from .maintenance import TASKS, run_maintenance
+
+
+def _reindex(dal: TitanHelpDAL, args: argparse.Namespace) -> int:
+    dal.rebuild_search_index()
+    print("Search index rebuilt.")
+    return 0
+
+
+def _import(dal: TitanHelpDAL, args: argparse.Namespace) -> int:
+    fmt = args.format or guess_format(args.file)
+    if fmt is None:
+        print("Cannot tell the file format from its name; pass --format.", file=sys.stderr)
+        return 2
+    started = time.perf_counter()
+    if args.file == "-":
+        result = dal.create_tickets_bulk(iter_records(sys.stdin, fmt), batch_size=args.batch_size, max_errors=args.max_errors)
+    else:
+        with open(args.file, newline="", encoding="utf-8") as fp:
+            result = dal.create_tickets_bulk(iter_records(fp, fmt), batch_size=args.batch_size, max_errors=args.max_errors)
+    elapsed = time.perf_counter() - started
+
+    for err in result.errors:
+        print(f"record {err.row}: {err.message}", file=sys.stderr)
+    if result.failed > len(result.errors):
+        print(f"... {result.failed - len(result.errors)} more errors not shown", file=sys.stderr)
+    rate = result.inserted / elapsed if elapsed > 0 else 0.0
+    print(f"Imported {result.inserted} tickets ({result.failed} failed) in {elapsed:.2f}s, {rate:,.0f} rows/s.")
+    return 1 if result.failed else 0
+
+
+def _stats(dal: TitanHelpDAL, args: argparse.Namespace) -> int:
+    if args.rebuild:
+        dal.rebuild_stats()
+        print("Statistics rebuilt from the tickets table.")
+    if args.check:
+        problems = dal.check_stats()
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        print("Statistics are consistent." if not problems else f"{len(problems)} mismatches; run 'stats --rebuild'.")
+        return 1 if problems else 0
+    print(json.dumps(dal.stats().to_dict(), indent=2))
+    return 0
+
+
+def _archive(dal: TitanHelpDAL, args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    moved = dal.archive_closed(args.days, batch_size=args.batch_size)
+    print(f"Archived {moved} tickets closed for more than {args.days} days in {time.perf_counter() - started:.2f}s "
+          f"({dal.archived_count()} in the archive).")
+    return 0
+
+
+def _size(n: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+def _describe(info: DatabaseInfo) -> str:
+    wal = f", WAL {_size(info.wal_bytes)}" if info.wal_bytes is not None else ""
+    return (f"{info.page_count:,} pages of {info.page_size} B ({_size(info.file_bytes)}), "
+            f"{info.freelist_count:,} free{wal}")
+
+
+def _maintain(dal: TitanHelpDAL, args: argparse.Namespace) -> int:
+    if args.full_vacuum:
+        started = time.perf_counter()
+        before = dal.database_info()
+        dal.vacuum()
+        print(f"Rebuilt the database in {time.perf_counter() - started:.2f}s: "
+              f"{_describe(before)} -> {_describe(dal.database_info())}.")
+        return 0
+    report = run_maintenance(
+        dal, args.tasks,
+        checkpoint_mode=args.checkpoint_mode,
+        busy_timeout=args.busy_timeout_ms / 1000,
+        analysis_limit=args.analysis_limit,
+        vacuum_pages=args.vacuum_pages,
+    )
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        for run in report.runs:
+            print(f"{run.task:<11} {run.seconds * 1000:8.1f} ms  {'' if run.ok else 'FAILED '}{run.detail}")
+        print(f"Before: {_describe(report.before)}")
+        print(f"After:  {_describe(report.after)}")
+    return 0 if report.ok else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m titanhelp_dal", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="titanhelp.db", help="path to the SQLite database (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("reindex", help="rebuild the full-text search index from the tickets table")
+    p.set_defaults(func=_reindex)
+
+    p = sub.add_parser("import", help="bulk-load tickets from a JSONL or CSV file ('-' for stdin)")
+    p.add_argument("file")
+    p.add_argument("--format", choices=FORMATS, help="input format (default: from the file extension)")
+    p.add_argument("--batch-size", type=int, default=1000, help="rows per transaction (default: %(default)s)")
+    p.add_argument("--max-errors", type=int, default=100, help="row errors to report (default: %(default)s)")
+    p.set_defaults(func=_import)
+
+    p = sub.add_parser("stats", help="print ticket statistics, or check/rebuild the summary tables")
+    p.add_argument("--check", action="store_true", help="compare the summary tables with a full scan")
+    p.add_argument("--rebuild", action="store_true", help="recompute the summary tables from tickets")
+    p.set_defaults(func=_stats)
+
+    p = sub.add_parser("archive", help="move long-closed tickets into the archive table")
+    p.add_argument("--days", type=int, default=90, help="archive tickets closed for more than this many days (default: %(default)s)")
+    p.add_argument("--batch-size", type=int, default=500, help="tickets moved per transaction (default: %(default)s)")
+    p.set_defaults(func=_archive)
+
+    p = sub.add_parser("maintain", help="checkpoint the WAL, refresh planner statistics and release free pages")
+    p.add_argument("--tasks", nargs="+", choices=TASKS, default=list(TASKS), help="tasks to run, in order (default: all)")
+    p.add_argument("--checkpoint-mode", choices=CHECKPOINT_MODES, default="TRUNCATE", help="(default: %(default)s)")
+    p.add_argument("--busy-timeout-ms", type=float, default=50,
+                   help="how long a checkpoint may wait for readers and writers (default: %(default)s)")
+    p.add_argument("--analysis-limit", type=int, default=400, help="rows ANALYZE samples per index, 0 for all (default: %(default)s)")
+    p.add_argument("--vacuum-pages", type=int, default=500, help="free pages released per transaction (default: %(default)s)")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    p.add_argument("--full-vacuum", action="store_true",
+                   help="instead: rebuild the file with VACUUM and enable incremental vacuum (blocks writers; run offline)")
+    p.set_defaults(func=_maintain)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    dal = TitanHelpDAL(args.db)
+    try:
+        return args.func(dal, args)
+    finally:
+        dal.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+from __future__ import annotations
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, TypeVar
+
+from .dal import CloseResult, Ticket, TicketPage, TicketStats, TitanHelpDAL
+
+T = TypeVar("T")
+
+
+class AsyncTitanHelpDAL:
+    """
+    asyncio front-end for TitanHelpDAL.
+
+    Every call runs on a worker thread so the event loop never blocks on
+    SQLite: reads go to a thread pool sized to the connection pool, writes
+    to one dedicated writer thread (SQLite has a single writer anyway, so
+    queueing them in-process avoids lock contention between our own threads).
+    The wrapped sync DAL - connection pool, cache and all - keeps working and
+    can be shared with sync code.
+
+        adal = AsyncTitanHelpDAL("titanhelp.db")
+        ticket = await adal.get_ticket(1)
+        await adal.aclose()
+    """
+    def __init__(
+        self,
+        db_path: str = "titanhelp.db",
+        *,
+        dal: Optional[TitanHelpDAL] = None,
+        read_workers: Optional[int] = None,
+        **dal_kwargs: Any,
+    ) -> None:
+        self._owns_dal = dal is None
+        self.dal = dal if dal is not None else TitanHelpDAL(db_path, **dal_kwargs)
+        workers = read_workers or self.dal.pool_stats().size
+        self._readers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="titanhelp-read")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="titanhelp-write")
+
+    async def _run(self, executor: ThreadPoolExecutor, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    # ---- reads ----
+    async def get_ticket(self, ticket_id: int, *, include_archived: bool = False) -> Optional[Ticket]:
+        return await self._run(self._readers, self.dal.get_ticket, ticket_id, include_archived=include_archived)
+
+    async def list_tickets(self, **filters: Any) -> List[Ticket]:
+        """Same keyword arguments as TitanHelpDAL.list_tickets."""
+        return await self._run(self._readers, self.dal.list_tickets, **filters)
+
+    async def page_tickets(self, **filters: Any) -> TicketPage:
+        """Same keyword arguments as TitanHelpDAL.page_tickets."""
+        return await self._run(self._readers, self.dal.page_tickets, **filters)
+
+    async def stats(self) -> TicketStats:
+        return await self._run(self._readers, self.dal.stats)
+
+    # ---- writes ----
+    async def create_ticket(self, name: str, description: str, *, priority: str = "Low") -> Ticket:
+        return await self._run(self._writer, self.dal.create_ticket, name, description, priority=priority)
+
+    async def update_ticket(self, ticket_id: int, **fields: Any) -> Optional[Ticket]:
+        """Same keyword arguments as TitanHelpDAL.update_ticket."""
+        return await self._run(self._writer, self.dal.update_ticket, ticket_id, **fields)
+
+    async def delete_ticket(self, ticket_id: int) -> bool:
+        return await self._run(self._writer, self.dal.delete_ticket, ticket_id)
+
+    async def set_status(self, ticket_id: int, status: str) -> Optional[Ticket]:
+        return await self._run(self._writer, self.dal.set_status, ticket_id, status)
+
+    async def set_priority(self, ticket_id: int, priority: str) -> Optional[Ticket]:
+        return await self._run(self._writer, self.dal.set_priority, ticket_id, priority)
+
+    async def close_ticket(self, ticket_id: int) -> CloseResult:
+        return await self._run(self._writer, self.dal.close_ticket, ticket_id)
+
+    async def update_many(
+        self,
+        ticket_ids: Iterable[int],
+        *,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+    ) -> List[int]:
+        return await self._run(self._writer, self.dal.update_many, list(ticket_ids), status=status, priority=priority)
+
+    # ---- lifecycle ----
+    async def aclose(self) -> None:
+        """Finish in-flight calls, stop the worker threads and close the DAL if we created it."""
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+
+    def _shutdown(self) -> None:
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        if self._owns_dal:
+            self.dal.close()
+
+    async def __aenter__(self) -> "AsyncTitanHelpDAL":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
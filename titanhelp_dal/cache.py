@@ -0,0 +1,119 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+
+
+# ---- Cache statistics ----
+@dataclass(slots=True)
+class CacheStats:
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int       # dropped to stay within maxsize
+    expirations: int     # dropped because their TTL ran out
+    invalidations: int   # dropped because the tickets changed
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+# ---- Cache ----
+class TicketCache:
+    """
+    Bounded LRU + TTL cache for DAL reads.
+
+    Entries are tagged with the database change counter (`generation`) they
+    were read under. A write that this process made is applied precisely
+    (apply_write); any other change to the counter, e.g. from another worker
+    process, drops everything (sync).
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, *, clock: Callable[[], float] = time.monotonic) -> None:
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.generation: Optional[int] = None
+        self._hits = self._misses = self._evictions = self._expirations = self._invalidations = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return False, None
+            expires, value = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, value
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int]) -> None:
+        """Store `value` unless the data changed since it was read."""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def sync(self, generation: int) -> None:
+        """Drop everything if the change counter moved behind our back."""
+        with self._lock:
+            if generation != self.generation:
+                self._invalidations += len(self._entries)
+                self._entries.clear()
+                self.generation = generation
+
+    def apply_write(self, before: int, after: int, ticket_ids: Iterable[int] = ()) -> None:
+        """
+        Invalidate after a local write that moved the counter from `before` to
+        `after`: the written tickets, cached misses (an insert may have created
+        that id) and every cached listing go. If anything else changed in
+        between, fall back to dropping everything.
+        """
+        with self._lock:
+            if self.generation == after:
+                return
+            if self.generation != before:
+                self._invalidations += len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [k for k, (_, value) in self._entries.items() if k[0] != "ticket" or not value]
+                stale.extend(("ticket", i) for i in ticket_ids if ("ticket", i) in self._entries)
+                for k in stale:
+                    del self._entries[k]
+                self._invalidations += len(stale)
+            self.generation = after
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+            self.generation = None
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                size=len(self._entries),
+                maxsize=self.maxsize,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+            )
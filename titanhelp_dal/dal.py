@@ -1,15 +1,58 @@
 from __future__ import annotations
+import base64
+import functools
+import json
+import os
+import random
+import re
 import sqlite3
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+import urllib.parse
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar, Union
+
+from .cache import CacheStats, TicketCache
+from .metrics import Metrics, Sample, instrumented_connection, is_busy_error
+from .migrations import DEFAULT_BATCH_SIZE, get_version, migrate, rebuild_stats
+from .pool import ConnectionPool, PoolStats
+from .writer import GroupCommitStats, GroupCommitWriter
 
 STATUS_VALUES = ("Open", "In Progress", "Closed")
 PRIORITY_VALUES = ("Low", "Medium", "High")
 
+# ---- Full-text search ----
+_FTS_TOKEN_RX = re.compile(r'"([^"]*)"|(\S+)')
+
+def _fts_query(search: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+    "quoted text" becomes a phrase query, every bare word a prefix query,
+    and all terms must match (implicit AND).
+    """
+    terms: List[str] = []
+    for phrase, word in _FTS_TOKEN_RX.findall(search):
+        if phrase.strip():
+            terms.append('"' + phrase.strip() + '"')
+        elif word:
+            word = word.replace('"', "")
+            if word:
+                terms.append('"' + word + '"*')
+    return " ".join(terms) or None
+
 # ---- Row dict factory (must be defined before use) ----
 def _dict_factory(cursor: sqlite3.Cursor, row: sqlite3.Row) -> Dict[str, Any]:
     return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
 
+def _display_date(created_at: Optional[str]) -> Optional[str]:
+    # 'YYYY-MM-DD HH:MM:SS' -> 'MM-DD-YYYY HH:MM:SS'
+    if not created_at or len(created_at) < 10 or created_at[4] != "-":
+        return created_at
+    return f"{created_at[5:7]}-{created_at[8:10]}-{created_at[:4]}{created_at[10:]}"
+
 # ---- Domain model ----
 @dataclass(slots=True)
 class Ticket:
@@ -18,62 +61,511 @@ class Ticket:
     description: str
     status: str = "Open"
     priority: str = "Low"
-    created_at: Optional[str] = None  # ISO8601 UTC
+    created_at: Optional[str] = None  # ISO8601 UTC, 'YYYY-MM-DD HH:MM:SS'
+    version: int = 1                  # bumped on every update
+    updated_at: Optional[str] = None  # ISO8601 UTC of the last update, None if never updated
 
     def to_db_tuple(self) -> Tuple[Any, ...]:
         return (self.name, self.description, self.status, self.priority)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
     
     @property
     def date(self) -> Optional[str]:
-        """Alias for created_at (so templates can use ticket.date)."""
-        return self.created_at
+        """created_at in display format 'MM-DD-YYYY HH:MM:SS' (so templates can use ticket.date)."""
+        return _display_date(self.created_at)
+
+# characters of description kept by listing (summary) queries
+PREVIEW_CHARS = 120
+
+@dataclass(slots=True)
+class TicketSummary:
+    """
+    Lightweight listing row: description is cut to a preview in SQL, and rows
+    are built positionally from the column order of _SUMMARY_COLUMNS.
+    """
+    id: int
+    name: str
+    preview: str
+    description_length: int
+    status: str
+    priority: str
+    created_at: Optional[str]
+
+    @property
+    def truncated(self) -> bool:
+        return self.description_length > len(self.preview)
+
+    @property
+    def date(self) -> Optional[str]:
+        return _display_date(self.created_at)
+
+_SUMMARY_COLUMNS = (
+    f"tickets.id, tickets.name, substr(tickets.description, 1, {PREVIEW_CHARS}) AS preview, "
+    "length(tickets.description) AS description_length, tickets.status, tickets.priority, tickets.created_at"
+)
+_SUMMARY_NAMES = "id, name, preview, description_length, status, priority, created_at"
+# Ticket's columns, shared by tickets and tickets_archive (queried "AS tickets")
+_TICKET_NAMES = "id, name, description, status, priority, created_at, version, updated_at"
+_TICKET_COLUMNS = ", ".join(f"tickets.{c}" for c in _TICKET_NAMES.split(", "))
+
+# ---- Data versions (HTTP validators) ----
+@dataclass(slots=True, frozen=True)
+class DataVersion:
+    seq: int                        # change_counter: bumped by every ticket write
+    changed_at: Optional[str]       # ISO8601 UTC of the last write
+
+@dataclass(slots=True, frozen=True)
+class TicketVersion:
+    id: int
+    version: int
+    modified_at: str                # updated_at, or created_at if never updated
+
+# ---- Change log ----
+@dataclass(slots=True, frozen=True)
+class TicketChange:
+    seq: int                    # position in the change log, increasing
+    ticket_id: int
+    op: str                     # 'insert', 'update' or 'delete'
+    name: Optional[str]
+    status: Optional[str]
+    priority: Optional[str]
+    changed_at: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+# close_ticket outcomes
+CLOSED = "closed"
+ALREADY_CLOSED = "already closed"
+NOT_FOUND = "not found"
+
+@dataclass(slots=True)
+class CloseResult:
+    outcome: str                # CLOSED, ALREADY_CLOSED or NOT_FOUND
+    ticket: Optional[Ticket]    # the ticket after the call (None if not found)
+
+# keep IN (...) lists well under SQLite's bound-parameter limit
+_IDS_PER_STATEMENT = 500
+
+# iter_tickets sort -> keyset columns (each ends in the unique id)
+_ITER_SORTS = {"id": ("id",), "created_at": ("created_at", "id")}
+
+@dataclass(slots=True)
+class TicketPage:
+    tickets: List[Any]                  # Ticket, or TicketSummary with summary=True
+    next_cursor: Optional[str] = None   # older tickets
+    prev_cursor: Optional[str] = None   # newer tickets
+
+@dataclass(slots=True)
+class RowError:
+    row: int        # 1-based position in the input
+    message: str
+
+@dataclass(slots=True)
+class BulkResult:
+    inserted: int = 0
+    failed: int = 0
+    errors: List[RowError] = field(default_factory=list)  # first max_errors failures only
+
+    def _add_error(self, row: int, message: str, max_errors: int) -> None:
+        self.failed += 1
+        if len(self.errors) < max_errors:
+            self.errors.append(RowError(row, message))
+
+# (label, min age in days, max age in days exclusive)
+AGE_BUCKETS: Tuple[Tuple[str, int, Optional[int]], ...] = (
+    ("Today", 0, 1),
+    ("1-6 days", 1, 7),
+    ("7-29 days", 7, 30),
+    ("30+ days", 30, None),
+)
+
+@dataclass(slots=True)
+class TicketStats:
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_status_priority: Dict[Tuple[str, str], int]
+    open_by_age: Dict[str, int]     # tickets not yet Closed, by AGE_BUCKETS label
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "by_status": self.by_status,
+            "by_priority": self.by_priority,
+            "by_status_priority": [
+                {"status": s, "priority": p, "count": n} for (s, p), n in self.by_status_priority.items()
+            ],
+            "open_by_age": self.open_by_age,
+        }
+
+# ---- Write contention ----
+@dataclass(slots=True)
+class ContentionStats:
+    transactions: int     # write transactions started (BEGIN IMMEDIATE)
+    retries: int          # BEGIN IMMEDIATE attempts repeated after "database is locked"
+    failures: int         # writes that were still locked out after every retry
+    lock_wait: float      # total seconds spent getting the write lock, backoff included
+    max_lock_wait: float
+
+    @property
+    def mean_lock_wait(self) -> float:
+        return self.lock_wait / self.transactions if self.transactions else 0.0
+
+# ---- Maintenance ----
+CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+_AUTO_VACUUM_MODES = ("NONE", "FULL", "INCREMENTAL")
+
+@dataclass(slots=True, frozen=True)
+class DatabaseInfo:
+    page_size: int
+    page_count: int
+    freelist_count: int         # unused pages; incremental vacuum hands them back to the filesystem
+    auto_vacuum: str            # NONE, FULL or INCREMENTAL
+    journal_mode: str
+    wal_bytes: Optional[int]    # size of the -wal file; None outside WAL mode or for in-memory databases
+
+    @property
+    def file_bytes(self) -> int:
+        return self.page_size * self.page_count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "file_bytes": self.file_bytes}
+
+@dataclass(slots=True, frozen=True)
+class CheckpointResult:
+    mode: str
+    busy: bool          # a reader or writer kept it from finishing; the WAL was not reset
+    wal_pages: int      # frames in the WAL beforehand (-1 when not in WAL mode)
+    checkpointed: int   # frames copied into the database file
+
+# ---- Date filters ----
+Timestamp = Union[str, date, datetime]
+
+def _timestamp_param(value: Timestamp) -> str:
+    """Normalize a date filter to the sortable created_at text format."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date: {value!r} (expected YYYY-MM-DD[ HH:MM:SS])") from None
+    if len(value) <= 10:
+        return parsed.date().isoformat()
+    return parsed.strftime("%Y-%m-%d %H:%M:%S")
+
+# ---- Pagination cursors ----
+def _encode_cursor(direction: str, ticket: Union[Ticket, TicketSummary]) -> str:
+    raw = json.dumps([direction, ticket.created_at, ticket.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[str, str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, created_at, ticket_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid page cursor") from None
+    if direction not in ("next", "prev") or not isinstance(ticket_id, int) or not isinstance(created_at, str):
+        raise ValueError("Invalid page cursor")
+    return direction, created_at, ticket_id
+
+# created_at is always passed: tables from before migration v3 still carry
+# the legacy 'MM-DD-YYYY' column DEFAULT
+_INSERT_TICKET = (
+    "INSERT INTO tickets(name, description, status, priority, created_at) "
+    "VALUES (?,?,?,?, strftime('%Y-%m-%d %H:%M:%S','now'))"
+)
+# every DAL UPDATE bumps the row version itself (RETURNING cannot see trigger changes)
+_BUMP_VERSION = "version = version + 1, updated_at = strftime('%Y-%m-%d %H:%M:%S','now')"
+
+_STATS_CHECKS = (
+    (
+        "count",
+        "SELECT status, priority, n FROM ticket_counts WHERE n != 0",
+        "SELECT status, priority, COUNT(*) AS n FROM "
+        "(SELECT status, priority FROM tickets UNION ALL SELECT status, priority FROM tickets_archive) "
+        "GROUP BY status, priority",
+    ),
+    (
+        "open day",
+        "SELECT day, n FROM open_ticket_days",
+        "SELECT substr(created_at, 1, 10) AS day, COUNT(*) AS n FROM tickets WHERE status != 'Closed' GROUP BY 1",
+    ),
+)
+
+# ---- Instrumentation ----
+F = TypeVar("F", bound=Callable[..., Any])
+
+def _timed(method: F) -> F:
+    """Record call time and exceptions in the DAL's Metrics; a no-op check when metrics are off."""
+    labels = (("method", method.__name__),)
+
+    @functools.wraps(method)
+    def wrapper(self: "TitanHelpDAL", *args: Any, **kwargs: Any) -> Any:
+        metrics = self._metrics
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        except Exception as e:
+            metrics.dal_error(method.__name__, e)
+            raise
+        finally:
+            metrics.observe("titanhelp_dal_call_seconds", labels, time.perf_counter() - start)
+    return wrapper  # type: ignore[return-value]
 
 # ---- DAL ----
 class TitanHelpDAL:
     """
     SQLite Data Access Layer for TitanHelp tickets.
     Creates DB and schema on first use.
+
+    Connections come from a bounded per-process pool and are configured once
+    when opened, so consecutive calls on the same thread reuse one connection.
+    Pass cache_size > 0 to cache reads; the cache is kept coherent with writes
+    from other processes through the change_counter table.
+    Pass a Metrics instance to record per-method timings, SQL statement
+    timings (with a slow-query log) and pool/cache counters.
+
+    Writes take the write lock up front (BEGIN IMMEDIATE). SQLite waits up to
+    busy_timeout seconds for it, then the DAL retries up to write_retries
+    times with jittered exponential backoff starting at retry_backoff seconds
+    (see contention_stats()).
+
+    db_path may be a "file:" URI. ":memory:" gives a private in-memory
+    database shared by all of this DAL's pooled connections (shared-cache
+    mode; meant for tests), which lives until close().
     """
     def __init__(
         self,
         db_path: str = "titanhelp.db",
         *,
         journal_mode: str = "WAL",      # use "DELETE" in tests on Windows
-        synchronous: str = "NORMAL"
+        synchronous: str = "NORMAL",
+        pool_size: int = 5,
+        pool_timeout: float = 5.0,
+        migration_batch_size: int = DEFAULT_BATCH_SIZE,
+        cache_size: int = 0,
+        cache_ttl: float = 30.0,
+        group_commit: bool = False,
+        group_commit_max_batch: int = 64,
+        group_commit_max_wait: float = 0.002,
+        busy_timeout: float = 5.0,
+        write_retries: int = 5,
+        retry_backoff: float = 0.01,
+        retry_backoff_max: float = 1.0,
+        metrics: Optional[Metrics] = None,
     ) -> None:
+        self._keepalive: Optional[sqlite3.Connection] = None
+        if db_path == ":memory:":
+            db_path = f"file:titanhelp-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        uri = db_path.startswith("file:")
+        shared_cache = uri and "cache=shared" in db_path
+        if uri and "mode=memory" in db_path:
+            # an in-memory database disappears with its last connection
+            self._keepalive = sqlite3.connect(db_path, uri=True, check_same_thread=False)
         self.db_path = db_path
+        # the file on disk, for WAL/file sizes; None for in-memory databases
+        self.file_path: Optional[str] = None
+        if self._keepalive is None:
+            self.file_path = urllib.parse.unquote(db_path[5:].split("?", 1)[0]) if uri else db_path
         self.journal_mode = journal_mode
         self.synchronous = synchronous
+        self.migration_batch_size = migration_batch_size
+        self.busy_timeout = busy_timeout
+        self.write_retries = write_retries
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self._contention_lock = threading.Lock()
+        self._contention = ContentionStats(0, 0, 0, 0.0, 0.0)
+        self.has_fts = False
+        # read-through cache for get_ticket/list_tickets/page_tickets; off when cache_size is 0
+        self._cache = TicketCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self._metrics = metrics
+        self._pool = ConnectionPool(
+            db_path,
+            size=pool_size,
+            timeout=pool_timeout,
+            row_factory=_dict_factory,
+            pragmas=(
+                "PRAGMA foreign_keys = ON;",
+                f"PRAGMA journal_mode = {journal_mode};",
+                f"PRAGMA synchronous = {synchronous};",
+                # shared-cache readers would otherwise take table locks that block writers
+                *(("PRAGMA read_uncommitted = 1;",) if shared_cache else ()),
+            ),
+            connect_kwargs={
+                "timeout": busy_timeout,
+                **({"uri": True} if uri else {}),
+                **({"factory": instrumented_connection(metrics)} if metrics is not None else {}),
+            },
+        )
         self._ensure_schema()
+        # opt-in: concurrent create_ticket calls share transactions via one writer thread
+        self._writer = (
+            GroupCommitWriter(self._create_batch, max_batch=group_commit_max_batch, max_wait=group_commit_max_wait)
+            if group_commit else None
+        )
+        if metrics is not None:
+            metrics.add_collector(self._collect_metrics)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Check out a pooled connection; commits on success, rolls back on error."""
+        with self._pool.connection() as conn:
+            with conn:
+                yield conn
+
+    @contextmanager
+    def _write(self, ticket_ids: Optional[List[int]] = None) -> Iterator[sqlite3.Connection]:
+        """
+        Pooled connection inside a BEGIN IMMEDIATE transaction. With the cache
+        enabled, the change counter is read under the write lock before and after
+        the caller's statements, so the cache can drop exactly the tickets in
+        `ticket_ids` (filled in by the caller, if need be) plus cached listings.
+        """
+        cache = self._cache
+        with self._connect() as conn:
+            self._begin_immediate(conn)
+            before = self._change_seq(conn) if cache is not None else 0
+            yield conn
+            after = self._change_seq(conn) if cache is not None else 0
+        if cache is not None and after != before:
+            cache.apply_write(before, after, ticket_ids or ())
+
+    def _begin_immediate(self, conn: sqlite3.Connection) -> None:
+        """
+        Take the write lock up front. A deferred transaction that has already
+        read cannot wait for it (SQLite fails it at once rather than risk a
+        deadlock), so every write path starts here. SQLite waits up to
+        busy_timeout on its own; a write still locked out after that (or
+        refused with SQLITE_LOCKED by a shared-cache database, which never
+        waits) is retried up to write_retries times with full-jitter
+        exponential backoff.
+        """
+        started = time.perf_counter()
+        retries = 0
+        failed = False
+        try:
+            while True:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    return
+                except sqlite3.OperationalError as e:
+                    if not is_busy_error(e):
+                        raise
+                    if retries >= self.write_retries:
+                        failed = True
+                        raise
+                retries += 1
+                time.sleep(random.uniform(0, min(self.retry_backoff_max, self.retry_backoff * 2 ** retries)))
+        finally:
+            waited = time.perf_counter() - started
+            with self._contention_lock:
+                c = self._contention
+                c.transactions += 1
+                c.retries += retries
+                c.failures += failed
+                c.lock_wait += waited
+                c.max_lock_wait = max(c.max_lock_wait, waited)
+
+    def contention_stats(self) -> ContentionStats:
+        """Write-lock retries, failures and wait time for this DAL."""
+        with self._contention_lock:
+            return replace(self._contention)
+
+    @staticmethod
+    def _change_seq(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT seq FROM change_counter WHERE id = 1").fetchone()["seq"]
+
+    def pool_stats(self) -> PoolStats:
+        return self._pool.stats()
+
+    def cache_stats(self) -> Optional[CacheStats]:
+        """Hit/miss/eviction counters, or None when the cache is disabled."""
+        return self._cache.stats() if self._cache is not None else None
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = _dict_factory
-        conn.execute("PRAGMA foreign_keys = ON;")
-        conn.execute(f"PRAGMA journal_mode = {self.journal_mode};")
-        conn.execute(f"PRAGMA synchronous = {self.synchronous};")
-        return conn
+    def group_commit_stats(self) -> Optional[GroupCommitStats]:
+        """Batching counters for the group-commit writer, or None when it is off."""
+        return self._writer.stats() if self._writer is not None else None
+
+    def _collect_metrics(self) -> List[Sample]:
+        pool = self._pool.stats()
+        samples: List[Sample] = [
+            ("titanhelp_pool_connections_opened_total", "counter", "SQLite connections opened by the pool.", (), pool.created),
+            ("titanhelp_pool_connections_open", "gauge", "SQLite connections currently open.", (), pool.open),
+            ("titanhelp_pool_connections_in_use", "gauge", "Pooled connections checked out right now.", (), pool.in_use),
+            ("titanhelp_pool_checkouts_total", "counter", "Connections handed out by the pool.", (), pool.checkouts),
+            ("titanhelp_pool_waits_total", "counter", "Checkouts that had to wait for a free connection.", (), pool.waits),
+            ("titanhelp_pool_wait_seconds_total", "counter", "Time spent waiting for a free connection.", (), pool.wait_time),
+        ]
+        contention = self.contention_stats()
+        samples += [
+            ("titanhelp_write_transactions_total", "counter", "Write transactions started.", (), contention.transactions),
+            ("titanhelp_write_retries_total", "counter", "Write-lock attempts retried after 'database is locked'.", (), contention.retries),
+            ("titanhelp_write_lock_failures_total", "counter", "Writes that gave up waiting for the write lock.", (), contention.failures),
+            ("titanhelp_write_lock_wait_seconds_total", "counter", "Time spent getting the write lock.", (), contention.lock_wait),
+        ]
+        cache = self.cache_stats()
+        if cache is not None:
+            for name in ("hits", "misses", "evictions", "expirations", "invalidations"):
+                samples.append((f"titanhelp_cache_{name}_total", "counter", f"Ticket cache {name}.", (), getattr(cache, name)))
+            samples.append(("titanhelp_cache_entries", "gauge", "Entries in the ticket cache.", (), cache.size))
+        writer = self.group_commit_stats()
+        if writer is not None:
+            samples.append(("titanhelp_group_commit_batches_total", "counter", "Group-commit transactions.", (), writer.batches))
+            samples.append(("titanhelp_group_commit_items_total", "counter", "Writes sent through group commit.", (), writer.items))
+            samples.append(("titanhelp_group_commit_queued", "gauge", "Writes waiting for the group-commit writer.", (), writer.queued))
+        return samples
+
+    def close(self) -> None:
+        """Flush queued writes and close pooled connections. The DAL must not be used afterwards."""
+        if self._writer is not None:
+            self._writer.close()
+        self._pool.close()
+        if self._keepalive is not None:
+            self._keepalive.close()
+            self._keepalive = None
 
     def _ensure_schema(self) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
-            cur = conn.cursor()
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS tickets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL CHECK(length(name) <= 100),
-                    created_at TEXT NOT NULL DEFAULT (strftime('%m-%d-%Y %H:%M:%S','now')),
-                    description TEXT NOT NULL CHECK(length(description) <= 1000),
-                    status TEXT NOT NULL DEFAULT 'Open' CHECK(status IN ('Open','In Progress','Closed')),
-                    priority TEXT NOT NULL DEFAULT 'Low' CHECK(priority IN ('Low','Medium','High'))
-                );
-                """
-            )
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status);")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_tickets_priority ON tickets(priority);")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets(created_at);")
-            conn.commit()
+        with self._connect() as conn:
+            migrate(conn, batch_size=self.migration_batch_size, begin=self._begin_immediate)
+            self.has_fts = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'"
+            ).fetchone() is not None
+
+    def schema_version(self) -> int:
+        with self._connect() as conn:
+            return get_version(conn)
+
+    @_timed
+    def data_version(self) -> DataVersion:
+        """Global change counter; reads one row, never touches tickets."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT seq, changed_at FROM change_counter WHERE id = 1").fetchone()
+        return DataVersion(seq=row["seq"], changed_at=row["changed_at"])
+
+    @_timed
+    def ticket_version(self, ticket_id: int) -> Optional[TicketVersion]:
+        """Version of one ticket without loading its name or description (None if missing)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT version, COALESCE(updated_at, created_at) AS modified_at FROM tickets WHERE id = ?",
+                (ticket_id,),
+            ).fetchone()
+        return TicketVersion(ticket_id, row["version"], row["modified_at"]) if row else None
+
+    def rebuild_search_index(self) -> None:
+        """Re-index every ticket from scratch (one-shot backfill / repair)."""
+        if not self.has_fts:
+            raise RuntimeError("SQLite was built without FTS5; search uses LIKE instead")
+        with self._write() as conn:
+            conn.execute("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild');")
 
     # ---- validations ----
     @staticmethod
@@ -101,36 +593,383 @@ class TitanHelpDAL:
             raise ValueError(f"Priority must be one of {PRIORITY_VALUES}")
 
     # ---- CRUD ----
+    @_timed
     def create_ticket(self, name: str, description: str, *, priority: str = "Low") -> Ticket:
         self._validate_name(name)
         self._validate_description(description)
         self._validate_priority(priority)
-        with self._connect() as conn:
+        if self._writer is not None:
+            return self._writer.submit((name.strip(), description.strip(), priority))
+        written: List[int] = []
+        with self._write(written) as conn:
             cur = conn.execute(
-                "INSERT INTO tickets(name, description, status, priority) VALUES (?,?,?,?)",
+                _INSERT_TICKET,
                 (name.strip(), description.strip(), "Open", priority),
             )
             ticket_id = cur.lastrowid
+            written.append(ticket_id)
             row = conn.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
         return self._row_to_ticket(row)
 
-    def get_ticket(self, ticket_id: int) -> Optional[Ticket]:
-        with self._connect() as conn:
-            row = conn.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
-            return self._row_to_ticket(row) if row else None
+    def _create_batch(self, items: List[Tuple[str, str, str]]) -> List[Any]:
+        """
+        Group-commit writer callback: insert validated (name, description, priority)
+        tuples in one transaction. A row rejected by a constraint gets its own
+        exception; anything else aborts (and fails) the whole batch.
+        """
+        results: List[Any] = []
+        written: List[int] = []
+        with self._write(written) as conn:
+            for name, description, priority in items:
+                try:
+                    cur = conn.execute(
+                        _INSERT_TICKET,
+                        (name, description, "Open", priority),
+                    )
+                except sqlite3.IntegrityError as e:
+                    results.append(e)
+                    continue
+                written.append(cur.lastrowid)
+                results.append(cur.lastrowid)
+            # RETURNING reports the row before AFTER INSERT triggers ran; read
+            # back what was actually stored, as create_ticket does
+            rows: Dict[int, Any] = {}
+            for start in range(0, len(written), _IDS_PER_STATEMENT):
+                chunk = written[start:start + _IDS_PER_STATEMENT]
+                marks = ",".join("?" * len(chunk))
+                for row in conn.execute(f"SELECT * FROM tickets WHERE id IN ({marks})", chunk):
+                    rows[row["id"]] = row
+        return [r if isinstance(r, Exception) else self._row_to_ticket(rows[r]) for r in results]
+
+    @_timed
+    def create_tickets_bulk(
+        self,
+        rows: Iterable[Any],
+        *,
+        batch_size: int = 1000,
+        max_errors: int = 1000,
+    ) -> BulkResult:
+        """
+        Insert many tickets, `batch_size` rows per transaction via executemany.
+        Each row is a mapping with name, description and optional priority/status.
+        Rows failing validation are reported in the result (numbered from 1) and
+        skipped; the rest of the batch is still inserted. Rows are consumed
+        lazily, so memory use does not grow with the input. A reader may yield
+        an exception for a record it could not parse; it is reported as that
+        row's error.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        result = BulkResult()
+        batch: List[Tuple[int, Tuple[str, str, str, str]]] = []
+        for index, row in enumerate(rows, start=1):
+            try:
+                batch.append((index, self._bulk_values(row)))
+            except ValueError as e:
+                result._add_error(index, str(e), max_errors)
+                continue
+            if len(batch) >= batch_size:
+                self._insert_batch(batch, result, max_errors)
+                batch = []
+        if batch:
+            self._insert_batch(batch, result, max_errors)
+        return result
 
+    def _bulk_values(self, row: Any) -> Tuple[str, str, str, str]:
+        if isinstance(row, Exception):
+            raise ValueError(str(row))
+        if not isinstance(row, Mapping):
+            raise ValueError(f"Row must be a mapping, got {type(row).__name__}")
+        name = row.get("name") or ""
+        description = row.get("description") or ""
+        status = row.get("status") or "Open"
+        priority = row.get("priority") or "Low"
+        if not isinstance(name, str) or not isinstance(description, str):
+            raise ValueError("Name and Problem Description must be strings")
+        self._validate_name(name)
+        self._validate_description(description)
+        self._validate_status(status)
+        self._validate_priority(priority)
+        return (name.strip(), description.strip(), status, priority)
+
+    def _insert_batch(
+        self,
+        batch: List[Tuple[int, Tuple[str, str, str, str]]],
+        result: BulkResult,
+        max_errors: int,
+    ) -> None:
+        sql = _INSERT_TICKET
+        try:
+            with self._write() as conn:
+                conn.executemany(sql, (values for _, values in batch))
+            result.inserted += len(batch)
+            return
+        except sqlite3.IntegrityError:
+            pass
+        # a row slipped past validation; isolate it and keep the others
+        with self._write() as conn:
+            for index, values in batch:
+                try:
+                    conn.execute(sql, values)
+                    result.inserted += 1
+                except sqlite3.IntegrityError as e:
+                    result._add_error(index, str(e), max_errors)
+
+    @_timed
+    def get_ticket(self, ticket_id: int, *, include_archived: bool = False) -> Optional[Ticket]:
+        """Look a ticket up by id; include_archived=True also finds archived tickets."""
+        if include_archived:
+            tickets = self._query_tickets(
+                f"SELECT {_TICKET_COLUMNS} FROM tickets WHERE id = ? "
+                f"UNION ALL SELECT {_TICKET_COLUMNS} FROM tickets_archive AS tickets WHERE id = ?",
+                (ticket_id, ticket_id),
+                key=("archived", ticket_id),
+            )
+        else:
+            tickets = self._query_tickets("SELECT * FROM tickets WHERE id = ?", (ticket_id,), key=("ticket", ticket_id))
+        return tickets[0] if tickets else None
+
+    @_timed
     def list_tickets(
         self,
         *,
         status: Optional[str] = None,
         priority: Optional[str] = None,
         search: Optional[str] = None,
+        created_since: Optional[Timestamp] = None,
+        created_before: Optional[Timestamp] = None,
         limit: int = 100,
         offset: int = 0,
         sort: str = "created_at DESC",
-    ) -> List[Ticket]:
+        summary: bool = False,
+        include_archived: bool = False,
+    ) -> List[Any]:
+        """
+        List tickets matching the given filters.
+        `search` uses the FTS5 index: bare words match as prefixes, "quoted text"
+        as phrases. Pass sort="rank" to order search results by relevance.
+        created_since/created_before bound created_at (inclusive/exclusive) and
+        take a date, datetime or ISO-8601 string.
+        With summary=True, returns TicketSummary rows carrying only the first
+        PREVIEW_CHARS characters of each description (for listings).
+        include_archived=True also lists archived tickets; the archive has no
+        search index, so there `search` is a substring match and ranked results
+        put archived matches after the live ones, newest first.
+        """
+        filters = dict(
+            status=status, priority=priority, search=search,
+            created_since=created_since, created_before=created_before,
+        )
+        source, clauses, params, match = self._filters(**filters)
+        ranked = sort == "rank" and match is not None
+        if sort == "rank":
+            sort = "tickets_fts.rank" if match else "created_at DESC"
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        if not include_archived:
+            columns = _SUMMARY_COLUMNS if summary else "tickets.*"
+            query = f"SELECT {columns} FROM {source} {where} ORDER BY {sort} LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+            return self._query_tickets(query, tuple(params), summary=summary)
+
+        # each side sorted and cut to limit + offset, then merged
+        _, archive_clauses, archive_params, _ = self._filters(**filters, fts=False)
+        archive_where = ("WHERE " + " AND ".join(archive_clauses)) if archive_clauses else ""
+        columns = _SUMMARY_COLUMNS if summary else _TICKET_COLUMNS
+        if ranked:
+            live_columns, archive_columns = f"{columns}, tickets_fts.rank AS _rank", f"{columns}, NULL AS _rank"
+            archive_sort, outer_sort = "created_at DESC", "_rank IS NULL, _rank, created_at DESC"
+        else:
+            live_columns = archive_columns = columns
+            archive_sort, outer_sort = sort, sort.replace("tickets.", "")
+        query = (
+            f"SELECT {_SUMMARY_NAMES if summary else _TICKET_NAMES} FROM ("
+            f"SELECT * FROM (SELECT {live_columns} FROM {source} {where} ORDER BY {sort} LIMIT ?) UNION ALL "
+            f"SELECT * FROM (SELECT {archive_columns} FROM tickets_archive AS tickets {archive_where} "
+            f"ORDER BY {archive_sort} LIMIT ?)"
+            f") ORDER BY {outer_sort} LIMIT ? OFFSET ?"
+        )
+        params = [*params, limit + offset, *archive_params, limit + offset, limit, offset]
+        return self._query_tickets(query, tuple(params), summary=summary)
+
+    def iter_tickets(
+        self,
+        *,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        search: Optional[str] = None,
+        created_since: Optional[Timestamp] = None,
+        created_before: Optional[Timestamp] = None,
+        sort: str = "id",
+        chunk_size: int = 500,
+    ) -> Iterator[Ticket]:
+        """
+        Lazily yield every ticket matching the filters (same as list_tickets,
+        without a limit), `chunk_size` rows at a time. `sort` is "id" or
+        "created_at", optionally followed by "DESC". Each chunk is its own
+        keyset query and the pooled connection goes back between chunks, so a
+        slow consumer (a streaming download) never pins one. Not a snapshot:
+        tickets written meanwhile may or may not show up, but none twice.
+        Arguments are validated immediately.
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        column, _, order = sort.strip().partition(" ")
+        order = order.strip().upper() or "ASC"
+        if column not in _ITER_SORTS or order not in ("ASC", "DESC"):
+            raise ValueError(f"Sort must be one of {', '.join(_ITER_SORTS)}, optionally with DESC")
+        source, clauses, params, _ = self._filters(
+            status=status, priority=priority, search=search,
+            created_since=created_since, created_before=created_before,
+        )
+        return self._iter_keyset(source, clauses, params, _ITER_SORTS[column], order, chunk_size)
+
+    def _iter_keyset(
+        self,
+        source: str,
+        clauses: List[str],
+        params: List[Any],
+        keys: Tuple[str, ...],
+        order: str,
+        chunk_size: int,
+    ) -> Iterator[Ticket]:
+        columns = ", ".join(f"tickets.{k}" for k in keys)
+        order_by = ", ".join(f"tickets.{k} {order}" for k in keys)
+        after = f"({columns}) {'<' if order == 'DESC' else '>'} ({', '.join('?' * len(keys))})"
+        last: Optional[Tuple[Any, ...]] = None
+        while True:
+            where = clauses + [after] if last else clauses
+            where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+            query = f"SELECT tickets.* FROM {source} {where_sql} ORDER BY {order_by} LIMIT ?"
+            with self._connect() as conn:
+                tickets = self._fetch_tickets(conn, query, (*params, *(last or ()), chunk_size), False)
+            yield from tickets
+            if len(tickets) < chunk_size:
+                return
+            last = tuple(getattr(tickets[-1], k) for k in keys)
+
+    @_timed
+    def page_tickets(
+        self,
+        *,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        search: Optional[str] = None,
+        created_since: Optional[Timestamp] = None,
+        created_before: Optional[Timestamp] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        summary: bool = False,
+    ) -> TicketPage:
+        """
+        Keyset-paginated listing, newest first on (created_at, id).
+        Pass a page's next_cursor/prev_cursor back in to move between pages; the
+        cost of a page does not depend on how deep it is, and tickets created
+        while paging do not shift later pages. summary=True works as in
+        list_tickets.
+        """
+        if limit < 1:
+            raise ValueError("Limit must be at least 1")
+        source, clauses, params, _ = self._filters(
+            status=status, priority=priority, search=search,
+            created_since=created_since, created_before=created_before,
+        )
+        direction = "next"
+        if cursor:
+            direction, created_at, ticket_id = _decode_cursor(cursor)
+            op = "<" if direction == "next" else ">"
+            clauses.append(f"(tickets.created_at, tickets.id) {op} (?, ?)")
+            params.extend([created_at, ticket_id])
+        order = "DESC" if direction == "next" else "ASC"
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        columns = _SUMMARY_COLUMNS if summary else "tickets.*"
+        query = (
+            f"SELECT {columns} FROM {source} {where} "
+            f"ORDER BY tickets.created_at {order}, tickets.id {order} LIMIT ?"
+        )
+        params.append(limit + 1)
+        tickets = self._query_tickets(query, tuple(params), summary=summary)
+
+        has_more = len(tickets) > limit
+        tickets = tickets[:limit]
+        if direction == "prev":
+            tickets.reverse()
+        if not tickets:
+            return TicketPage(tickets=[], next_cursor=None, prev_cursor=None)
+        first, last = tickets[0], tickets[-1]
+        if direction == "next":
+            next_cursor = _encode_cursor("next", last) if has_more else None
+            prev_cursor = _encode_cursor("prev", first) if cursor else None
+        else:
+            next_cursor = _encode_cursor("next", last)
+            prev_cursor = _encode_cursor("prev", first) if has_more else None
+        return TicketPage(tickets=tickets, next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+    def _query_tickets(
+        self,
+        query: str,
+        params: Tuple[Any, ...],
+        *,
+        key: Optional[Tuple[Any, ...]] = None,
+        summary: bool = False,
+    ) -> List[Any]:
+        """
+        Run a ticket SELECT, read-through the cache when it is enabled.
+        summary=True queries select _SUMMARY_COLUMNS and skip the dict row
+        factory: tuples go straight into TicketSummary.
+        """
+        cache = self._cache
+        if cache is None:
+            with self._connect() as conn:
+                return self._fetch_tickets(conn, query, params, summary)
+
+        key = key or ("list", query, params)
+        with self._connect() as conn:
+            generation = self._change_seq(conn)
+            cache.sync(generation)
+            hit, cached = cache.get(key)
+            if not hit:
+                cached = tuple(self._fetch_tickets(conn, query, params, summary))
+        if not hit:
+            cache.put(key, cached, generation)
+        # callers may mutate what they get back; never hand out the cached objects
+        return [replace(t) for t in cached]
+
+    def _fetch_tickets(
+        self,
+        conn: sqlite3.Connection,
+        query: str,
+        params: Tuple[Any, ...],
+        summary: bool,
+    ) -> List[Any]:
+        if summary:
+            cur = conn.cursor()
+            cur.row_factory = None
+            return [TicketSummary(*r) for r in cur.execute(query, params)]
+        return [self._row_to_ticket(r) for r in conn.execute(query, params).fetchall()]
+
+    def _filters(
+        self,
+        *,
+        status: Optional[str],
+        priority: Optional[str],
+        search: Optional[str],
+        created_since: Optional[Timestamp] = None,
+        created_before: Optional[Timestamp] = None,
+        fts: bool = True,
+    ) -> Tuple[str, List[str], List[Any], Optional[str]]:
+        """Shared WHERE builder: returns (FROM source, clauses, params, fts match)."""
         clauses: List[str] = []
         params: List[Any] = []
+        source = "tickets"
+        match = _fts_query(search) if search and fts and self.has_fts else None
+        if match:
+            source = "tickets JOIN tickets_fts ON tickets_fts.rowid = tickets.id"
+            clauses.append("tickets_fts MATCH ?")
+            params.append(match)
+        elif search:
+            clauses.append("(name LIKE ? OR description LIKE ?)")
+            like = f"%{search}%"
+            params.extend([like, like])
         if status:
             self._validate_status(status)
             clauses.append("status = ?")
@@ -139,17 +978,15 @@ class TitanHelpDAL:
             self._validate_priority(priority)
             clauses.append("priority = ?")
             params.append(priority)
-        if search:
-            clauses.append("(name LIKE ? OR description LIKE ?)")
-            like = f"%{search}%"
-            params.extend([like, like])
-        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
-        query = f"SELECT * FROM tickets {where} ORDER BY {sort} LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-        with self._connect() as conn:
-            rows = conn.execute(query, tuple(params)).fetchall()
-        return [self._row_to_ticket(r) for r in rows]
+        if created_since is not None:
+            clauses.append("tickets.created_at >= ?")
+            params.append(_timestamp_param(created_since))
+        if created_before is not None:
+            clauses.append("tickets.created_at < ?")
+            params.append(_timestamp_param(created_before))
+        return source, clauses, params, match
 
+    @_timed
     def update_ticket(
         self,
         ticket_id: int,
@@ -182,15 +1019,84 @@ class TitanHelpDAL:
         if not sets:
             return self.get_ticket(ticket_id)
 
-        with self._connect() as conn:
-            conn.execute(f"UPDATE tickets SET {', '.join(sets)} WHERE id = ?", (*params, ticket_id))
+        with self._write([ticket_id]) as conn:
+            row = conn.execute(
+                f"UPDATE tickets SET {', '.join(sets)}, {_BUMP_VERSION} WHERE id = ? RETURNING *", (*params, ticket_id)
+            ).fetchone()
+        return self._row_to_ticket(row) if row else None
+
+    @_timed
+    def close_ticket(self, ticket_id: int) -> CloseResult:
+        """
+        Close a ticket with one conditional UPDATE, so concurrent closes cannot
+        both succeed. Only when nothing was updated is the row looked up (in the
+        same transaction) to tell "already closed" from "not found".
+        """
+        with self._write([ticket_id]) as conn:
+            row = conn.execute(
+                f"UPDATE tickets SET status = 'Closed', {_BUMP_VERSION} WHERE id = ? AND status != 'Closed' RETURNING *",
+                (ticket_id,),
+            ).fetchone()
+            if row:
+                return CloseResult(CLOSED, self._row_to_ticket(row))
             row = conn.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
-            return self._row_to_ticket(row) if row else None
+        if row:
+            return CloseResult(ALREADY_CLOSED, self._row_to_ticket(row))
+        return CloseResult(NOT_FOUND, None)
+
+    @_timed
+    def update_many(
+        self,
+        ticket_ids: Iterable[int],
+        *,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+    ) -> List[int]:
+        """
+        Set status and/or priority on many tickets in one transaction.
+        Returns the ids of the tickets that actually changed.
+        """
+        sets: List[str] = []
+        changed: List[str] = []
+        params: List[Any] = []
+        if status is not None:
+            self._validate_status(status)
+            sets.append("status = ?")
+            changed.append("status != ?")
+            params.append(status)
+        if priority is not None:
+            self._validate_priority(priority)
+            sets.append("priority = ?")
+            changed.append("priority != ?")
+            params.append(priority)
+        ids = sorted({int(i) for i in ticket_ids})
+        if not sets or not ids:
+            return []
+
+        updated: List[int] = []
+        with self._write(updated) as conn:
+            for start in range(0, len(ids), _IDS_PER_STATEMENT):
+                chunk = ids[start:start + _IDS_PER_STATEMENT]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"UPDATE tickets SET {', '.join(sets)}, {_BUMP_VERSION} "
+                    f"WHERE id IN ({marks}) AND ({' OR '.join(changed)}) RETURNING id",
+                    (*params, *chunk, *params),
+                ).fetchall()
+                updated.extend(r["id"] for r in rows)
+        return sorted(updated)
 
+    def set_status_many(self, ticket_ids: Iterable[int], status: str) -> List[int]:
+        return self.update_many(ticket_ids, status=status)
+
+    def set_priority_many(self, ticket_ids: Iterable[int], priority: str) -> List[int]:
+        return self.update_many(ticket_ids, priority=priority)
+
+    @_timed
     def delete_ticket(self, ticket_id: int) -> bool:
-        with self._connect() as conn:
+        with self._write([ticket_id]) as conn:
             cur = conn.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
-            return cur.rowcount > 0
+        return cur.rowcount > 0
 
     def set_status(self, ticket_id: int, status: str) -> Optional[Ticket]:
         return self.update_ticket(ticket_id, status=status)
@@ -198,6 +1104,225 @@ class TitanHelpDAL:
     def set_priority(self, ticket_id: int, priority: str) -> Optional[Ticket]:
         return self.update_ticket(ticket_id, priority=priority)
 
+    # ---- archive ----
+    @_timed
+    def archive_closed(self, older_than_days: int = 90, *, batch_size: int = 500) -> int:
+        """
+        Move tickets that have been Closed, and untouched, for more than
+        `older_than_days` days into tickets_archive. Each batch of at most
+        `batch_size` tickets is its own short transaction, so writers are
+        never blocked for long. Returns the number of tickets moved.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        if older_than_days < 0:
+            raise ValueError("older_than_days must not be negative")
+        with self._connect() as conn:
+            cutoff = conn.execute("SELECT datetime('now', ?) AS cutoff", (f"-{int(older_than_days)} days",)).fetchone()["cutoff"]
+        moved = 0
+        while True:
+            ids: List[int] = []
+            with self._write(ids) as conn:
+                ids.extend(r["id"] for r in conn.execute(
+                    "SELECT id FROM tickets WHERE status = 'Closed' AND COALESCE(updated_at, created_at) < ? "
+                    "ORDER BY id LIMIT ?",
+                    (cutoff, batch_size),
+                ))
+                for start in range(0, len(ids), _IDS_PER_STATEMENT):
+                    chunk = ids[start:start + _IDS_PER_STATEMENT]
+                    marks = ",".join("?" * len(chunk))
+                    conn.execute(
+                        f"INSERT INTO tickets_archive({_TICKET_NAMES}) "
+                        f"SELECT {_TICKET_NAMES} FROM tickets WHERE id IN ({marks})",
+                        chunk,
+                    )
+                    conn.execute(f"DELETE FROM tickets WHERE id IN ({marks})", chunk)
+            moved += len(ids)
+            if len(ids) < batch_size:
+                return moved
+
+    def archived_count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) AS n FROM tickets_archive").fetchone()["n"]
+
+    # ---- change log ----
+    @_timed
+    def changes_since(self, seq: int, *, limit: int = 1000) -> List[TicketChange]:
+        """
+        Ticket inserts, edits and deletes logged after `seq`, oldest first, at
+        most `limit` of them. Pass the last change's seq back in to continue.
+        Only the most recent CHANGE_LOG_RETENTION entries are kept; compare
+        with oldest_change_seq() to tell whether a reader fell behind.
+        """
+        if limit < 1:
+            raise ValueError("Limit must be at least 1")
+        with self._connect() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            return [
+                TicketChange(*r) for r in cur.execute(
+                    "SELECT seq, ticket_id, op, name, status, priority, changed_at FROM ticket_changes "
+                    "WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (seq, limit),
+                )
+            ]
+
+    def latest_change_seq(self) -> int:
+        """seq of the newest change-log entry (0 if there is none)."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) AS seq FROM ticket_changes").fetchone()["seq"]
+
+    def oldest_change_seq(self) -> int:
+        """seq of the oldest change-log entry still kept (0 if there is none)."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(MIN(seq), 0) AS seq FROM ticket_changes").fetchone()["seq"]
+
+    # ---- statistics ----
+    @_timed
+    def stats(self) -> TicketStats:
+        """
+        Ticket counts by status/priority and open-ticket age buckets, read from
+        the trigger-maintained summary tables only (cost does not grow with
+        the number of tickets).
+        """
+        with self._connect() as conn:
+            counts = conn.execute("SELECT status, priority, n FROM ticket_counts WHERE n > 0").fetchall()
+            ages = conn.execute(
+                "SELECT CAST(julianday(date('now')) - julianday(day) AS INTEGER) AS age, n FROM open_ticket_days"
+            ).fetchall()
+        by_status = {s: 0 for s in STATUS_VALUES}
+        by_priority = {p: 0 for p in PRIORITY_VALUES}
+        by_status_priority: Dict[Tuple[str, str], int] = {}
+        for r in counts:
+            by_status[r["status"]] += r["n"]
+            by_priority[r["priority"]] += r["n"]
+            by_status_priority[(r["status"], r["priority"])] = r["n"]
+        open_by_age = {label: 0 for label, _, _ in AGE_BUCKETS}
+        for r in ages:
+            age = max(r["age"] or 0, 0)
+            for label, low, high in AGE_BUCKETS:
+                if age >= low and (high is None or age < high):
+                    open_by_age[label] += r["n"]
+                    break
+        return TicketStats(
+            total=sum(by_status.values()),
+            by_status=by_status,
+            by_priority=by_priority,
+            by_status_priority=by_status_priority,
+            open_by_age=open_by_age,
+        )
+
+    @_timed
+    def check_stats(self) -> List[str]:
+        """Compare the summary tables with a full scan; returns the mismatches found."""
+        with self._connect() as conn:
+            conn.execute("BEGIN")     # one snapshot for both sides
+            problems: List[str] = []
+            for label, summary_sql, actual_sql in _STATS_CHECKS:
+                summary = {tuple(r.values())[:-1]: r["n"] for r in conn.execute(summary_sql)}
+                actual = {tuple(r.values())[:-1]: r["n"] for r in conn.execute(actual_sql)}
+                for k in sorted(set(summary) | set(actual), key=str):
+                    if summary.get(k, 0) != actual.get(k, 0):
+                        problems.append(f"{label} {'/'.join(map(str, k))}: summary {summary.get(k, 0)}, actual {actual.get(k, 0)}")
+        return problems
+
+    @_timed
+    def rebuild_stats(self) -> None:
+        with self._write() as conn:
+            rebuild_stats(conn)
+
+    # ---- maintenance ----
+    @_timed
+    def database_info(self) -> DatabaseInfo:
+        """Page counts, free pages and WAL size, from PRAGMAs and the -wal file."""
+        with self._connect() as conn:
+            values = {
+                name: conn.execute(f"PRAGMA {name}").fetchone()[name]
+                for name in ("page_size", "page_count", "freelist_count", "auto_vacuum", "journal_mode")
+            }
+        wal_bytes = None
+        if values["journal_mode"] == "wal" and self.file_path is not None:
+            try:
+                wal_bytes = os.path.getsize(self.file_path + "-wal")
+            except OSError:
+                wal_bytes = 0
+        return DatabaseInfo(
+            page_size=values["page_size"],
+            page_count=values["page_count"],
+            freelist_count=values["freelist_count"],
+            auto_vacuum=_AUTO_VACUUM_MODES[values["auto_vacuum"]],
+            journal_mode=values["journal_mode"],
+            wal_bytes=wal_bytes,
+        )
+
+    @_timed
+    def checkpoint(self, mode: str = "TRUNCATE", *, busy_timeout: float = 0.05) -> CheckpointResult:
+        """
+        Copy the WAL into the database file (PRAGMA wal_checkpoint). A PASSIVE
+        pass runs first and never waits. FULL, RESTART and TRUNCATE then need
+        every reader out of the WAL and hold the write lock while they wait, so
+        they give up after `busy_timeout` seconds rather than stall writers;
+        the result has busy=True and the WAL keeps its size until next time.
+        """
+        mode = mode.upper()
+        if mode not in CHECKPOINT_MODES:
+            raise ValueError(f"Checkpoint mode must be one of {', '.join(CHECKPOINT_MODES)}")
+        with self._connect() as conn:
+            row = passive = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+            if mode != "PASSIVE":
+                previous = conn.execute("PRAGMA busy_timeout").fetchone()["timeout"]
+                conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+                try:
+                    row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+                finally:
+                    conn.execute(f"PRAGMA busy_timeout = {int(previous)}")
+        busy = bool(row["busy"])
+        # a finished RESTART/TRUNCATE reports the reset WAL; count what the PASSIVE pass found
+        checkpointed = passive["checkpointed"] if busy or mode == "PASSIVE" else passive["log"]
+        return CheckpointResult(mode=mode, busy=busy, wal_pages=passive["log"], checkpointed=checkpointed)
+
+    @_timed
+    def analyze(self, *, analysis_limit: int = 400) -> None:
+        """
+        Refresh the query planner's statistics (ANALYZE). `analysis_limit`
+        caps the rows sampled per index so the write lock stays short on big
+        tables; 0 reads everything.
+        """
+        with self._write() as conn:
+            conn.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+            conn.execute("ANALYZE")
+
+    @_timed
+    def incremental_vacuum(self, pages: int = 500) -> int:
+        """
+        Hand up to `pages` free pages back to the filesystem in one short write
+        transaction; returns how many were released. Only databases in
+        auto_vacuum=INCREMENTAL mode can do this (new ones are; see vacuum()).
+        """
+        if pages < 1:
+            raise ValueError("Pages must be at least 1")
+        with self._write() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()["auto_vacuum"] != 2:
+                return 0
+            before = conn.execute("PRAGMA freelist_count").fetchone()["freelist_count"]
+            # sqlite3 steps a statement without result columns only once, and each
+            # step of incremental_vacuum frees one page: run it once per page
+            for _ in range(min(pages, before)):
+                conn.execute("PRAGMA incremental_vacuum")
+            return before - conn.execute("PRAGMA freelist_count").fetchone()["freelist_count"]
+
+    @_timed
+    def vacuum(self, *, incremental: bool = True) -> None:
+        """
+        Rebuild the whole database file (VACUUM), switching it to incremental
+        auto-vacuum first unless `incremental` is False. Writers wait for the
+        full rebuild and it needs disk space for a copy of the database: an
+        offline job, not one to schedule.
+        """
+        with self._connect() as conn:
+            conn.execute(f"PRAGMA auto_vacuum = {'INCREMENTAL' if incremental else 'NONE'}")
+            conn.execute("VACUUM")
+
     @staticmethod
     def _row_to_ticket(row: Dict[str, Any]) -> Ticket:
         return Ticket(
@@ -207,5 +1332,7 @@ class TitanHelpDAL:
             status=row["status"],
             priority=row["priority"],
             created_at=row["created_at"],
+            version=row["version"],
+            updated_at=row["updated_at"],
         )
 
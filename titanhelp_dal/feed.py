@@ -0,0 +1,151 @@
+from __future__ import annotations
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+from .dal import TicketChange, TitanHelpDAL
+
+log = logging.getLogger(__name__)
+
+
+# ---- Feed statistics ----
+@dataclass(slots=True)
+class ChangeFeedStats:
+    polls: int            # change-log queries run by the poller
+    changes: int          # changes read from the log
+    waiting: int          # subscribers blocked in wait() right now
+    last_seq: int         # newest change seen
+    backlog: int          # changes kept in memory for replay
+
+
+# ---- Feed ----
+class ChangeFeed:
+    """
+    One change-log poller per process, shared by every live-update client.
+
+    A background thread reads TitanHelpDAL.changes_since() every `interval`
+    seconds, but only while someone is waiting, and keeps the most recent
+    `backlog` changes in memory. Subscribers block in wait() and are all
+    woken by the same poll, so database load does not grow with the number
+    of connected clients.
+
+        feed = ChangeFeed(dal)
+        seq = feed.head()
+        while True:
+            changes = feed.wait(seq, timeout=15)
+            if changes is None:
+                ...  # fell behind the backlog: reload everything
+            for change in changes:
+                seq = change.seq
+    """
+    def __init__(self, dal: TitanHelpDAL, *, interval: float = 1.0, backlog: int = 1000) -> None:
+        if backlog < 1:
+            raise ValueError("Backlog must be at least 1")
+        self.dal = dal
+        self.interval = interval
+        self.backlog = backlog
+        self._cond = threading.Condition(threading.Lock())
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._started = False
+        self._changes: Deque[TicketChange] = deque(maxlen=backlog)
+        self._last_seq = 0
+        self._waiting = 0
+        self._polls = 0
+        self._seen = 0
+
+    def _ensure_started(self) -> None:
+        # called with the lock held; threads do not survive fork
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = None
+            self._started = False
+        if not self._started:
+            # prime the backlog so clients reconnecting right away can catch up
+            latest = self.dal.latest_change_seq()
+            self._changes.clear()
+            self._changes.extend(self.dal.changes_since(max(latest - self.backlog, 0), limit=self.backlog))
+            self._last_seq = self._changes[-1].seq if self._changes else latest
+            self._started = True
+        if not self._stop.is_set() and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, name="titanhelp-change-feed", daemon=True)
+            self._thread.start()
+
+    def head(self) -> int:
+        """seq of the newest change in the log; a new subscriber starts from here."""
+        with self._cond:
+            self._ensure_started()
+            seen = self._last_seq
+        # the poller idles while nobody waits, so ask the log itself
+        return max(seen, self.dal.latest_change_seq())
+
+    def wait(self, after_seq: int, timeout: float) -> Optional[List[TicketChange]]:
+        """
+        Changes newer than `after_seq`, blocking up to `timeout` seconds for
+        the first one. Returns [] on timeout, or None if changes after
+        `after_seq` are no longer in the backlog (the caller must resync).
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._ensure_started()
+            while True:
+                floor = self._changes[0].seq - 1 if self._changes else self._last_seq
+                if after_seq < floor:
+                    return None
+                if self._last_seq > after_seq:
+                    return [c for c in self._changes if c.seq > after_seq]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    return []
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _run(self) -> None:
+        more = False
+        # a full read means more is queued: poll again straight away
+        while not self._stop.wait(0 if more else self.interval):
+            more = False
+            with self._cond:
+                if not self._waiting:
+                    continue
+                after = self._last_seq
+            try:
+                changes = self.dal.changes_since(after, limit=self.backlog)
+            except Exception:
+                log.exception("change feed poll failed")
+                continue
+            more = len(changes) == self.backlog
+            with self._cond:
+                self._polls += 1
+                if changes:
+                    self._changes.extend(changes)
+                    self._seen += len(changes)
+                    self._last_seq = changes[-1].seq
+                    self._cond.notify_all()
+
+    def close(self) -> None:
+        """Stop the poller and release every waiting subscriber."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+            thread = self._thread if self._pid == os.getpid() else None
+        if thread is not None:
+            thread.join()
+
+    def stats(self) -> ChangeFeedStats:
+        with self._cond:
+            return ChangeFeedStats(
+                polls=self._polls,
+                changes=self._seen,
+                waiting=self._waiting,
+                last_seq=self._last_seq,
+                backlog=len(self._changes),
+            )
@@ -0,0 +1,53 @@
+"""
+Streaming readers for bulk ticket import (see TitanHelpDAL.create_tickets_bulk).
+
+Each reader yields one mapping per record and never loads the whole file.
+A record that cannot be parsed is yielded as a ValueError so the bulk insert
+reports it against that record instead of aborting the import.
+"""
+from __future__ import annotations
+import csv
+import json
+from typing import Any, Iterator, Optional, TextIO
+
+FORMATS = ("jsonl", "csv")
+
+
+def iter_jsonl(fp: TextIO) -> Iterator[Any]:
+    for line_no, line in enumerate(fp, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"Invalid JSON on line {line_no}: {e.msg}")
+
+
+def iter_csv(fp: TextIO) -> Iterator[Any]:
+    """Rows of a CSV file with a header line (name, description[, priority, status])."""
+    reader = csv.DictReader(fp)
+    try:
+        for row in reader:
+            if None in row:
+                yield ValueError(f"Too many fields on line {reader.line_num}")
+            else:
+                yield row
+    except csv.Error as e:
+        yield ValueError(f"Invalid CSV on line {reader.line_num}: {e}")
+
+
+def guess_format(path: str) -> Optional[str]:
+    lowered = path.lower()
+    if lowered.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return None
+
+
+def iter_records(fp: TextIO, fmt: str) -> Iterator[Any]:
+    if fmt == "jsonl":
+        return iter_jsonl(fp)
+    if fmt == "csv":
+        return iter_csv(fp)
+    raise ValueError(f"Format must be one of {FORMATS}")
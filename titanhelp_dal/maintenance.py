@@ -0,0 +1,280 @@
+"""
+Routine database upkeep: WAL checkpoints, planner statistics and incremental vacuum.
+
+Run it in-process with a MaintenanceScheduler, or from cron with
+`python -m titanhelp_dal maintain`.
+"""
+from __future__ import annotations
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .dal import DatabaseInfo, TitanHelpDAL
+from .metrics import Metrics, Sample
+
+log = logging.getLogger(__name__)
+
+# checkpoint last, so it also folds in what analyze and vacuum wrote
+TASKS = ("analyze", "vacuum", "checkpoint")
+
+
+# ---- Reports ----
+@dataclass(slots=True)
+class TaskRun:
+    task: str
+    started_at: float     # time.time()
+    seconds: float
+    ok: bool
+    detail: str           # what the task did, or the error it raised
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class MaintenanceReport:
+    before: DatabaseInfo
+    after: DatabaseInfo
+    runs: List[TaskRun]
+
+    @property
+    def ok(self) -> bool:
+        return all(r.ok for r in self.runs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "before": self.before.to_dict(),
+            "after": self.after.to_dict(),
+            "runs": [r.to_dict() for r in self.runs],
+        }
+
+
+@dataclass(slots=True)
+class MaintenanceStats:
+    runs: Dict[str, int]                    # finished runs per task, failed ones included
+    failures: Dict[str, int]
+    last_run: Dict[str, TaskRun] = field(default_factory=dict)
+    database: Optional[DatabaseInfo] = None  # as of the latest maintenance pass
+
+
+# ---- One pass ----
+def run_maintenance(
+    dal: TitanHelpDAL,
+    tasks: Iterable[str] = TASKS,
+    *,
+    checkpoint_mode: str = "TRUNCATE",
+    busy_timeout: float = 0.05,
+    analysis_limit: int = 400,
+    vacuum_pages: int = 500,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> MaintenanceReport:
+    """
+    Run `tasks` once, in order, and report what each did and how long it
+    took. The vacuum releases `vacuum_pages` pages per transaction and checks
+    `should_stop` between transactions, so writers are never held up for long.
+    """
+    tasks = list(tasks)
+    for task in tasks:
+        if task not in TASKS:
+            raise ValueError(f"Unknown maintenance task {task!r}; expected one of {', '.join(TASKS)}")
+    stop = should_stop or (lambda: False)
+    before = dal.database_info()
+    runs: List[TaskRun] = []
+    for task in tasks:
+        if stop():
+            break
+        started_at, started = time.time(), time.perf_counter()
+        try:
+            if task == "checkpoint":
+                result = dal.checkpoint(checkpoint_mode, busy_timeout=busy_timeout)
+                if result.wal_pages < 0:
+                    detail = "skipped: not in WAL mode"
+                else:
+                    detail = f"{result.mode}: {result.checkpointed}/{result.wal_pages} WAL frames copied"
+                    if result.busy:
+                        detail += ", WAL in use (not reset)"
+            elif task == "analyze":
+                dal.analyze(analysis_limit=analysis_limit)
+                detail = "statistics refreshed"
+            elif before.auto_vacuum != "INCREMENTAL":
+                detail = f"skipped: auto_vacuum is {before.auto_vacuum} (convert with 'maintain --full-vacuum')"
+            else:
+                released = 0
+                while True:
+                    freed = dal.incremental_vacuum(vacuum_pages)
+                    released += freed
+                    if freed < vacuum_pages or stop():
+                        break
+                detail = f"released {released} pages"
+            ok = True
+        except sqlite3.Error as e:
+            log.warning("maintenance task %s failed: %s", task, e)
+            detail, ok = f"{type(e).__name__}: {e}", False
+        runs.append(TaskRun(task, started_at, time.perf_counter() - started, ok, detail))
+    return MaintenanceReport(before=before, after=dal.database_info(), runs=runs)
+
+
+# ---- Scheduler ----
+class MaintenanceScheduler:
+    """
+    Runs maintenance tasks in a background thread, each on its own interval
+    (seconds; None turns a task off), but only in idle windows: once nothing
+    has been written for `idle_for` seconds, by this process or another one
+    (the change counter has not moved and the database and WAL files are
+    unchanged). Reads, such as a live-update feed polling, do not count. A task
+    that falls due while the database is busy waits for the next window, and
+    a vacuum stops between batches as soon as a write lands.
+
+        scheduler = MaintenanceScheduler(dal, checkpoint_every=300)
+        scheduler.start()
+    """
+    def __init__(
+        self,
+        dal: TitanHelpDAL,
+        *,
+        checkpoint_every: Optional[float] = 300.0,
+        analyze_every: Optional[float] = 3600.0,
+        vacuum_every: Optional[float] = 86400.0,
+        idle_for: float = 5.0,
+        poll_interval: float = 1.0,
+        checkpoint_mode: str = "TRUNCATE",
+        busy_timeout: float = 0.05,
+        analysis_limit: int = 400,
+        vacuum_pages: int = 500,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        self.dal = dal
+        self.intervals = {"checkpoint": checkpoint_every, "analyze": analyze_every, "vacuum": vacuum_every}
+        self.idle_for = idle_for
+        self.poll_interval = poll_interval
+        self.options = {
+            "checkpoint_mode": checkpoint_mode,
+            "busy_timeout": busy_timeout,
+            "analysis_limit": analysis_limit,
+            "vacuum_pages": vacuum_pages,
+        }
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._last_due = {task: time.monotonic() for task in TASKS}
+        self._runs = {task: 0 for task in TASKS}
+        self._failures = {task: 0 for task in TASKS}
+        self._last_run: Dict[str, TaskRun] = {}
+        self._database: Optional[DatabaseInfo] = None
+        if metrics is not None:
+            metrics.add_collector(self._collect_metrics)
+
+    def start(self) -> None:
+        with self._lock:
+            # threads do not survive fork: start a fresh one in the child
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = None
+            if not self._stop.is_set() and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="titanhelp-maintenance", daemon=True)
+                self._thread.start()
+
+    def run_now(self, tasks: Iterable[str] = TASKS) -> MaintenanceReport:
+        """Run `tasks` immediately, idle or not, and record them like scheduled runs."""
+        report = run_maintenance(self.dal, tasks, **self.options)
+        self._record(report)
+        return report
+
+    def _activity(self) -> Tuple[Any, ...]:
+        # changes whenever anyone writes: tickets move the change counter, the rest the files
+        files: List[Any] = []
+        if self.dal.file_path is not None:
+            for suffix in ("", "-wal"):
+                try:
+                    st = os.stat(self.dal.file_path + suffix)
+                    files.append((st.st_size, st.st_mtime_ns))
+                except OSError:
+                    files.append(None)
+        return (self.dal.data_version().seq, *files)
+
+    def _due(self, now: float) -> List[str]:
+        return [t for t in TASKS if self.intervals[t] and now - self._last_due[t] >= self.intervals[t]]
+
+    def _run(self) -> None:
+        seen = self._activity()
+        settled = None      # activity right after our last pass
+        quiet_since = time.monotonic()
+        while not self._stop.wait(self.poll_interval):
+            current, now = self._activity(), time.monotonic()
+            if current != seen:
+                seen, quiet_since = current, now
+                continue
+            due = self._due(now)
+            if not due or now - quiet_since < self.idle_for:
+                continue
+            if current == settled:
+                # nothing has touched the database since the last pass
+                for task in due:
+                    self._last_due[task] = now
+                continue
+            seq = self.dal.latest_change_seq()
+            try:
+                report = run_maintenance(
+                    self.dal, due, **self.options,
+                    should_stop=lambda: self._stop.is_set() or self.dal.latest_change_seq() != seq,
+                )
+            except Exception:
+                log.exception("maintenance pass failed")
+            else:
+                self._record(report)
+            for task in due:
+                self._last_due[task] = now
+            # our own checkpoint/vacuum touched the files
+            seen = settled = self._activity()
+
+    def _record(self, report: MaintenanceReport) -> None:
+        with self._lock:
+            self._database = report.after
+            for run in report.runs:
+                self._runs[run.task] += 1
+                self._failures[run.task] += not run.ok
+                self._last_run[run.task] = run
+        if self._metrics is not None:
+            for run in report.runs:
+                labels = (("task", run.task),)
+                self._metrics.observe("titanhelp_maintenance_seconds", labels, run.seconds)
+                if not run.ok:
+                    self._metrics.inc("titanhelp_maintenance_failures_total", labels)
+        for run in report.runs:
+            log.info("maintenance %s took %.1f ms: %s", run.task, run.seconds * 1000, run.detail)
+
+    def _collect_metrics(self) -> List[Sample]:
+        with self._lock:
+            info = self._database
+        if info is None:
+            return []
+        samples: List[Sample] = [
+            ("titanhelp_db_pages", "gauge", "Database pages at the last maintenance pass.", (), info.page_count),
+            ("titanhelp_db_free_pages", "gauge", "Unused database pages at the last maintenance pass.", (), info.freelist_count),
+        ]
+        if info.wal_bytes is not None:
+            samples.append(("titanhelp_db_wal_bytes", "gauge", "WAL file size at the last maintenance pass.", (), info.wal_bytes))
+        return samples
+
+    def close(self) -> None:
+        """Stop the scheduler, letting a task in progress finish."""
+        self._stop.set()
+        with self._lock:
+            thread = self._thread if self._pid == os.getpid() else None
+        if thread is not None:
+            thread.join()
+
+    def stats(self) -> MaintenanceStats:
+        with self._lock:
+            return MaintenanceStats(
+                runs=dict(self._runs),
+                failures=dict(self._failures),
+                last_run=dict(self._last_run),
+                database=self._database,
+            )
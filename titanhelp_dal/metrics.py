@@ -0,0 +1,245 @@
+"""
+Lightweight in-process metrics with Prometheus text output.
+
+Nothing here runs unless a Metrics instance is handed to TitanHelpDAL (or the
+app); with metrics off the DAL only pays for one `is None` check per call.
+"""
+from __future__ import annotations
+import bisect
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+# (name, type, help, labels, value) rows reported by collectors at scrape time
+Sample = Tuple[str, str, str, Labels, float]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+slow_query_log = logging.getLogger("titanhelp_dal.slow_query")
+
+_HELP = {
+    "titanhelp_dal_call_seconds": ("histogram", "Time spent in TitanHelpDAL methods."),
+    "titanhelp_dal_errors_total": ("counter", "Exceptions raised by TitanHelpDAL methods."),
+    "titanhelp_sqlite_statement_seconds": ("histogram", "Time spent executing SQL statements."),
+    "titanhelp_sqlite_statements_total": ("counter", "SQL statements run, including trigger bodies."),
+    "titanhelp_sqlite_slow_queries_total": ("counter", "Statements slower than the slow-query threshold."),
+    "titanhelp_sqlite_busy_total": ("counter", "'database is locked/busy' errors."),
+    "titanhelp_http_request_seconds": ("histogram", "HTTP request latency by route."),
+    "titanhelp_maintenance_seconds": ("histogram", "Time spent in database maintenance tasks."),
+    "titanhelp_maintenance_failures_total": ("counter", "Database maintenance tasks that raised an error."),
+}
+
+
+# ---- Histogram ----
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    at: float           # time.time() when it finished
+    seconds: float
+    sql: str
+
+
+# ---- Registry ----
+class Metrics:
+    """
+    Thread-safe registry of counters and histograms.
+
+    Statements slower than `slow_query_threshold` seconds are logged on the
+    "titanhelp_dal.slow_query" logger (SQL text only, never parameters) and
+    kept in a short ring buffer (see slow_queries()).
+    """
+    def __init__(
+        self,
+        *,
+        slow_query_threshold: float = 0.1,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        slow_query_history: int = 100,
+    ) -> None:
+        self.slow_query_threshold = slow_query_threshold
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._slow: Deque[SlowQuery] = deque(maxlen=slow_query_history)
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        key = (name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(value)
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def counter(self, name: str, labels: Labels = ()) -> float:
+        with self._lock:
+            return self._counters.get((name, labels), 0)
+
+    def histogram(self, name: str, labels: Labels) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get((name, labels))
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Register a callable producing gauge/counter samples at scrape time."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    # ---- SQLite hooks ----
+    def statement(self, sql: str, seconds: float) -> None:
+        self.observe("titanhelp_sqlite_statement_seconds", (("kind", _statement_kind(sql)),), seconds)
+        if seconds >= self.slow_query_threshold:
+            text = " ".join(sql.split())
+            self.inc("titanhelp_sqlite_slow_queries_total")
+            with self._lock:
+                self._slow.append(SlowQuery(time.time(), seconds, text))
+            slow_query_log.warning("slow query (%.1f ms): %s", seconds * 1000, text)
+
+    def trace(self, sql: str) -> None:
+        # sqlite3 trace callback: fires for every statement, trigger bodies included
+        self.inc("titanhelp_sqlite_statements_total", (("kind", _statement_kind(sql)),))
+
+    def dal_error(self, method: str, error: BaseException) -> None:
+        self.inc("titanhelp_dal_errors_total", (("method", method), ("error", type(error).__name__)))
+        if isinstance(error, sqlite3.OperationalError) and is_busy_error(error):
+            self.inc("titanhelp_sqlite_busy_total", (("method", method),))
+
+    def slow_queries(self) -> List[SlowQuery]:
+        with self._lock:
+            return list(self._slow)
+
+    # ---- Exposition ----
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        seen = set()
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), hist in histograms:
+            kind, help_text = _HELP.get(name, ("histogram", name))
+            header(name, kind, help_text)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), hist.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {hist.total}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {hist.count}")
+        for (name, labels), value in counters:
+            kind, help_text = _HELP.get(name, ("counter", name))
+            header(name, kind, help_text)
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+        for collector in collectors:
+            for name, kind, help_text, labels, value in collector():
+                header(name, kind, help_text)
+                lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def is_busy_error(error: BaseException) -> bool:
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def instrumented_connection(metrics: Metrics) -> type:
+    """
+    sqlite3.Connection subclass (pass as connect(factory=...)) that times every
+    execute()/executemany(), on the connection or its cursors, into `metrics`
+    and counts statements through the trace callback. Python's sqlite3 has no
+    profile hook, so statement time is measured around execute(): preparation
+    plus the first step, which is where sorts, aggregates and writes do their
+    work.
+    """
+    class InstrumentedCursor(sqlite3.Cursor):
+        def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+            start = time.perf_counter()
+            try:
+                return super().execute(sql, parameters)
+            finally:
+                metrics.statement(sql, time.perf_counter() - start)
+
+        def executemany(self, sql: str, parameters: Any, /) -> sqlite3.Cursor:
+            start = time.perf_counter()
+            try:
+                return super().executemany(sql, parameters)
+            finally:
+                metrics.statement(sql, time.perf_counter() - start)
+
+    class InstrumentedConnection(sqlite3.Connection):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            self.set_trace_callback(metrics.trace)
+
+        def cursor(self, factory: Any = InstrumentedCursor) -> sqlite3.Cursor:  # type: ignore[override]
+            return super().cursor(factory)
+
+        def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+            start = time.perf_counter()
+            try:
+                return super().execute(sql, parameters)
+            finally:
+                metrics.statement(sql, time.perf_counter() - start)
+
+        def executemany(self, sql: str, parameters: Any, /) -> sqlite3.Cursor:
+            start = time.perf_counter()
+            try:
+                return super().executemany(sql, parameters)
+            finally:
+                metrics.statement(sql, time.perf_counter() - start)
+
+    return InstrumentedConnection
+
+
+def _statement_kind(sql: str) -> str:
+    stripped = sql.lstrip()
+    if stripped.startswith("--"):
+        return "trigger"
+    word = stripped.split(None, 1)[0].lower() if stripped else ""
+    return word if word in ("select", "insert", "update", "delete", "begin", "commit", "rollback", "pragma") else "other"
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
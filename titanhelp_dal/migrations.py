@@ -0,0 +1,438 @@
+"""
+Versioned schema migrations for the TitanHelp database.
+
+The applied version is kept in `PRAGMA user_version`. Every migration runs
+once, in order, inside a BEGIN IMMEDIATE transaction, so processes opening
+the same database at once take turns and skip steps another one applied.
+A migration that returns True is called again in a fresh transaction, so
+large rewrites can commit in batches and let other writers in between. A
+migration must still be safe to re-run if it was interrupted before its
+version was recorded.
+"""
+from __future__ import annotations
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+DEFAULT_BATCH_SIZE = 5000
+
+# ---- Migration registry ----
+@dataclass(slots=True, frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection, int], Optional[bool]]   # (conn, batch_size) -> more to do
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("PRAGMA user_version;").fetchone()
+    return row["user_version"] if isinstance(row, dict) else row[0]
+
+
+def _set_version(conn: sqlite3.Connection, version: int) -> None:
+    # PRAGMA does not accept bound parameters; version is always an int we own
+    conn.execute(f"PRAGMA user_version = {int(version)};")
+
+
+# ---- Migrations ----
+def _v1_base_schema(conn: sqlite3.Connection, batch_size: int) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL CHECK(length(name) <= 100),
+            created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%S','now')),
+            description TEXT NOT NULL CHECK(length(description) <= 1000),
+            status TEXT NOT NULL DEFAULT 'Open' CHECK(status IN ('Open','In Progress','Closed')),
+            priority TEXT NOT NULL DEFAULT 'Low' CHECK(priority IN ('Low','Medium','High'))
+        );
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_priority ON tickets(priority);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets(created_at);")
+
+
+_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_ai AFTER INSERT ON tickets BEGIN
+        INSERT INTO tickets_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_ad AFTER DELETE ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_au AFTER UPDATE OF name, description ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO tickets_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END;
+    """,
+)
+
+
+def _v2_search_index(conn: sqlite3.Connection, batch_size: int) -> None:
+    """External-content FTS5 index over name/description, kept in sync by triggers."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'"
+    ).fetchone()
+    try:
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+                name, description, content='tickets', content_rowid='id'
+            );
+            """
+        )
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5: search falls back to LIKE
+        return
+    for trigger in _FTS_TRIGGERS:
+        conn.execute(trigger)
+    if not exists:
+        # existing database: index the tickets that predate the FTS table
+        conn.execute("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild');")
+
+
+# 'MM-DD-YYYY HH:MM:SS' -> 'YYYY-MM-DD HH:MM:SS'
+_LEGACY_TS_GLOB = "[0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9] *"
+_ISO_FROM_LEGACY = "substr({c}, 7, 4) || '-' || substr({c}, 1, 2) || '-' || substr({c}, 4, 2) || substr({c}, 11)"
+
+
+def _v3_sortable_timestamps(conn: sqlite3.Connection, batch_size: int) -> bool:
+    """
+    Rewrite legacy 'MM-DD-YYYY HH:MM:SS' created_at values as ISO-8601 text,
+    which sorts chronologically. Rows are converted in place, one batch per
+    transaction, so a large table never holds the write lock for long. Old
+    tables keep their legacy column DEFAULT (SQLite cannot alter it in place);
+    the DAL always passes created_at, so it never applies.
+    """
+    iso = _ISO_FROM_LEGACY.format(c="created_at")
+    cur = conn.execute(
+        f"""
+        UPDATE tickets SET created_at = {iso}
+        WHERE id IN (SELECT id FROM tickets WHERE created_at GLOB ? LIMIT ?)
+        """,
+        (_LEGACY_TS_GLOB, batch_size),
+    )
+    return cur.rowcount == batch_size
+
+
+def _v4_composite_indexes(conn: sqlite3.Connection, batch_size: int) -> None:
+    """
+    Indexes matching list_tickets' filter + sort combinations. The old
+    single-column status/priority indexes are prefixes of these and go away.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_status_priority_created ON tickets(status, priority, created_at);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_status_created ON tickets(status, created_at);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_priority_created ON tickets(priority, created_at);")
+    conn.execute("DROP INDEX IF EXISTS idx_tickets_status;")
+    conn.execute("DROP INDEX IF EXISTS idx_tickets_priority;")
+    conn.execute("ANALYZE tickets;")
+
+
+def _v5_change_counter(conn: sqlite3.Connection, batch_size: int) -> None:
+    """
+    Single-row counter bumped by every insert, update and delete on tickets,
+    so any process can tell cheaply whether tickets changed (used by the cache).
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_counter (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            seq INTEGER NOT NULL
+        );
+        """
+    )
+    conn.execute("INSERT OR IGNORE INTO change_counter(id, seq) VALUES (1, 0);")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS change_counter_{event.lower()} AFTER {event} ON tickets BEGIN
+                UPDATE change_counter SET seq = seq + 1 WHERE id = 1;
+            END;
+            """
+        )
+
+
+# Tickets that still need attention (everything not Closed) count as "open".
+_STATS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS ticket_stats_ai AFTER INSERT ON tickets BEGIN
+        INSERT INTO ticket_counts(status, priority, n) VALUES (new.status, new.priority, 1)
+            ON CONFLICT(status, priority) DO UPDATE SET n = n + 1;
+        INSERT INTO open_ticket_days(day, n) SELECT substr(new.created_at, 1, 10), 1 WHERE new.status != 'Closed'
+            ON CONFLICT(day) DO UPDATE SET n = n + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ticket_stats_ad AFTER DELETE ON tickets BEGIN
+        UPDATE ticket_counts SET n = n - 1 WHERE status = old.status AND priority = old.priority;
+        UPDATE open_ticket_days SET n = n - 1 WHERE day = substr(old.created_at, 1, 10) AND old.status != 'Closed';
+        DELETE FROM open_ticket_days WHERE day = substr(old.created_at, 1, 10) AND n <= 0;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ticket_stats_au AFTER UPDATE OF status, priority, created_at ON tickets BEGIN
+        UPDATE ticket_counts SET n = n - 1 WHERE status = old.status AND priority = old.priority;
+        INSERT INTO ticket_counts(status, priority, n) VALUES (new.status, new.priority, 1)
+            ON CONFLICT(status, priority) DO UPDATE SET n = n + 1;
+        UPDATE open_ticket_days SET n = n - 1 WHERE day = substr(old.created_at, 1, 10) AND old.status != 'Closed';
+        DELETE FROM open_ticket_days WHERE day = substr(old.created_at, 1, 10) AND n <= 0;
+        INSERT INTO open_ticket_days(day, n) SELECT substr(new.created_at, 1, 10), 1 WHERE new.status != 'Closed'
+            ON CONFLICT(day) DO UPDATE SET n = n + 1;
+    END;
+    """,
+)
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def rebuild_stats(conn: sqlite3.Connection) -> None:
+    """Recompute the summary tables from tickets and the archive (also the repair path)."""
+    conn.execute("DELETE FROM ticket_counts;")
+    conn.execute("DELETE FROM open_ticket_days;")
+    source = "tickets"
+    if _table_exists(conn, "tickets_archive"):
+        source = "(SELECT status, priority FROM tickets UNION ALL SELECT status, priority FROM tickets_archive)"
+    conn.execute(
+        "INSERT INTO ticket_counts(status, priority, n) "
+        f"SELECT status, priority, COUNT(*) FROM {source} GROUP BY status, priority;"
+    )
+    conn.execute(
+        "INSERT INTO open_ticket_days(day, n) "
+        "SELECT substr(created_at, 1, 10), COUNT(*) FROM tickets WHERE status != 'Closed' GROUP BY 1;"
+    )
+
+
+def _v6_ticket_stats(conn: sqlite3.Connection, batch_size: int) -> None:
+    """
+    Summary tables kept current by triggers, so dashboards never scan tickets:
+    counts per (status, priority) and open tickets per creation day.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ticket_counts (
+            status TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (status, priority)
+        ) WITHOUT ROWID;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS open_ticket_days (
+            day TEXT PRIMARY KEY,
+            n INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        """
+    )
+    for trigger in _STATS_TRIGGERS:
+        conn.execute(trigger)
+    rebuild_stats(conn)
+
+
+_NOW = "strftime('%Y-%m-%d %H:%M:%S','now')"
+
+
+def _v7_data_versions(conn: sqlite3.Connection, batch_size: int) -> None:
+    """
+    Cheap validators for HTTP caching: a per-ticket version/updated_at pair
+    (bumped by the DAL's own UPDATEs, or by a trigger for any other writer)
+    and the time of the last change next to the global change counter.
+    Columns are added only if missing and triggers re-created with IF NOT
+    EXISTS, so the step can be re-run (migrate() holds the write lock).
+    """
+    columns = {r["name"] if isinstance(r, dict) else r[1] for r in conn.execute("PRAGMA table_info(tickets);")}
+    if "version" not in columns:
+        conn.execute("ALTER TABLE tickets ADD COLUMN version INTEGER NOT NULL DEFAULT 1;")
+    if "updated_at" not in columns:
+        conn.execute("ALTER TABLE tickets ADD COLUMN updated_at TEXT;")
+    columns = {r["name"] if isinstance(r, dict) else r[1] for r in conn.execute("PRAGMA table_info(change_counter);")}
+    if "changed_at" not in columns:
+        conn.execute("ALTER TABLE change_counter ADD COLUMN changed_at TEXT;")
+        conn.execute(f"UPDATE change_counter SET changed_at = {_NOW} WHERE id = 1;")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"DROP TRIGGER IF EXISTS change_counter_{event.lower()};")
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS change_counter_{event.lower()} AFTER {event} ON tickets BEGIN
+                UPDATE change_counter SET seq = seq + 1, changed_at = {_NOW} WHERE id = 1;
+            END;
+            """
+        )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS tickets_version_bump AFTER UPDATE ON tickets
+        WHEN new.version = old.version BEGIN
+            UPDATE tickets SET version = old.version + 1, updated_at = {_NOW} WHERE id = new.id;
+        END;
+        """
+    )
+
+
+def _v8_archive(conn: sqlite3.Connection, batch_size: int) -> None:
+    """
+    Cold storage for long-closed tickets (see TitanHelpDAL.archive_closed).
+    Rows keep their ids; statistics keep counting them through the
+    ticket_counts triggers below, so moving a ticket leaves totals unchanged.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tickets_archive (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            description TEXT NOT NULL,
+            status TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 1,
+            updated_at TEXT,
+            archived_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%S','now'))
+        );
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_archive_created ON tickets_archive(created_at);")
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS ticket_stats_archive_ai AFTER INSERT ON tickets_archive BEGIN
+            INSERT INTO ticket_counts(status, priority, n) VALUES (new.status, new.priority, 1)
+                ON CONFLICT(status, priority) DO UPDATE SET n = n + 1;
+        END;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS ticket_stats_archive_ad AFTER DELETE ON tickets_archive BEGIN
+            UPDATE ticket_counts SET n = n - 1 WHERE status = old.status AND priority = old.priority;
+        END;
+        """
+    )
+
+
+# change-log rows kept; older ones are pruned as new ones arrive
+CHANGE_LOG_RETENTION = 10000
+
+
+def _v9_change_log(conn: sqlite3.Connection, batch_size: int) -> None:
+    """
+    Append-only log of ticket inserts, edits and deletes for live updates
+    (TitanHelpDAL.changes_since). Every 1000th entry prunes everything older
+    than the last CHANGE_LOG_RETENTION entries.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ticket_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id INTEGER NOT NULL,
+            op TEXT NOT NULL CHECK(op IN ('insert','update','delete')),
+            name TEXT,
+            status TEXT,
+            priority TEXT,
+            changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%S','now'))
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS ticket_changes_ai AFTER INSERT ON tickets BEGIN
+            INSERT INTO ticket_changes(ticket_id, op, name, status, priority)
+            VALUES (new.id, 'insert', new.name, new.status, new.priority);
+        END;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS ticket_changes_au AFTER UPDATE OF name, description, status, priority ON tickets BEGIN
+            INSERT INTO ticket_changes(ticket_id, op, name, status, priority)
+            VALUES (new.id, 'update', new.name, new.status, new.priority);
+        END;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS ticket_changes_ad AFTER DELETE ON tickets BEGIN
+            INSERT INTO ticket_changes(ticket_id, op, name, status, priority)
+            VALUES (old.id, 'delete', old.name, old.status, old.priority);
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS ticket_changes_prune AFTER INSERT ON ticket_changes
+        WHEN new.seq % 1000 = 0 BEGIN
+            DELETE FROM ticket_changes WHERE seq <= new.seq - {CHANGE_LOG_RETENTION};
+        END;
+        """
+    )
+
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(1, "base tickets schema", _v1_base_schema),
+    Migration(2, "FTS5 search index", _v2_search_index),
+    Migration(3, "ISO-8601 created_at", _v3_sortable_timestamps),
+    Migration(4, "composite filter/sort indexes", _v4_composite_indexes),
+    Migration(5, "ticket change counter", _v5_change_counter),
+    Migration(6, "trigger-maintained ticket statistics", _v6_ticket_stats),
+    Migration(7, "ticket versions and change timestamps", _v7_data_versions),
+    Migration(8, "closed-ticket archive", _v8_archive),
+    Migration(9, "ticket change log", _v9_change_log),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+# ---- Runner ----
+def _begin_immediate(conn: sqlite3.Connection) -> None:
+    conn.execute("BEGIN IMMEDIATE;")
+
+
+def migrate(
+    conn: sqlite3.Connection,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    begin: Callable[[sqlite3.Connection], None] = _begin_immediate,
+) -> List[Migration]:
+    """
+    Apply every migration newer than the database's user_version.
+    `begin` opens each write transaction; pass one that retries when the
+    busy timeout is short. Returns the migrations that were applied.
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1")
+    if get_version(conn) >= SCHEMA_VERSION:
+        # the common case on every start: one PRAGMA read, no DDL
+        return []
+    if not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+        # a brand-new file: auto_vacuum can only be chosen before the first table
+        # exists, and VACUUM applies it (instantly, the file is empty) even when
+        # journal_mode=WAL has already written the header
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+        try:
+            conn.execute("VACUUM;")
+        except sqlite3.OperationalError:
+            # another process is creating the schema right now; its VACUUM counts
+            pass
+    applied: List[Migration] = []
+    for migration in MIGRATIONS:
+        more = get_version(conn) < migration.version
+        while more:
+            begin(conn)
+            try:
+                # re-read under the write lock: another process may have applied it while we waited
+                more = get_version(conn) < migration.version and bool(migration.apply(conn, batch_size))
+                if not more and get_version(conn) < migration.version:
+                    _set_version(conn, migration.version)
+                    applied.append(migration)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    return applied
@@ -0,0 +1,186 @@
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no pooled connection became free within the pool timeout."""
+
+
+# ---- Pool statistics ----
+@dataclass(slots=True)
+class PoolStats:
+    size: int              # max connections the pool will hold open
+    open: int              # connections currently open
+    idle: int              # open connections waiting in the pool
+    in_use: int            # connections checked out right now
+    created: int           # connections opened over the pool's lifetime
+    checkouts: int         # successful acquire() calls
+    waits: int             # acquire() calls that had to block for a free connection
+    wait_time: float       # total seconds spent blocked in acquire()
+
+
+# ---- Pool ----
+class ConnectionPool:
+    """
+    Bounded pool of persistent SQLite connections.
+
+    Connections are opened lazily, configured once (row factory + PRAGMAs) and
+    handed out to one thread at a time. Each process keeps its own pool: after
+    a fork the inherited connections are dropped and fresh ones are opened.
+    """
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        size: int = 5,
+        timeout: float = 5.0,
+        pragmas: Sequence[str] = (),
+        row_factory: Optional[Callable] = None,
+        connect_kwargs: Optional[dict] = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = tuple(pragmas)
+        self.row_factory = row_factory
+        self.connect_kwargs = dict(connect_kwargs or {})
+        self._cond = threading.Condition(threading.Lock())
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._pid = os.getpid()
+        self._idle: List[sqlite3.Connection] = []
+        self._open = 0
+        self._created = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._closed = False
+
+    def _check_pid(self) -> None:
+        # connections must never cross a fork; drop the inherited ones unclosed
+        if self._pid != os.getpid():
+            self._cond = threading.Condition(threading.Lock())
+            self._reset_state()
+
+    def _new_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, **self.connect_kwargs)
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        self._check_pid()
+        deadline: Optional[float] = None
+        waited_from: Optional[float] = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    # reserve the slot, then connect outside the lock
+                    self._open += 1
+                    conn = None
+                    break
+                now = time.monotonic()
+                if waited_from is None:
+                    waited_from = now
+                    deadline = now + self.timeout
+                    self._waits += 1
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._wait_time += now - waited_from
+                    raise PoolTimeout(f"No free connection after {self.timeout:.1f}s (pool size {self.size})")
+                self._cond.wait(remaining)
+            if waited_from is not None:
+                self._wait_time += time.monotonic() - waited_from
+            self._checkouts += 1
+
+        if conn is None:
+            try:
+                conn = self._new_connection()
+            except BaseException:
+                with self._cond:
+                    self._open -= 1
+                    self._checkouts -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._created += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if self._pid != os.getpid():
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # closed or otherwise unusable: don't put it back
+            self.discard(conn)
+            return
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                conn.close()
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def discard(self, conn: sqlite3.Connection) -> None:
+        """Close a checked-out connection instead of returning it (e.g. after a fatal error)."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        finally:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close idle connections; checked-out ones are closed when released."""
+        self._check_pid()
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> PoolStats:
+        self._check_pid()
+        with self._cond:
+            idle = len(self._idle)
+            return PoolStats(
+                size=self.size,
+                open=self._open,
+                idle=idle,
+                in_use=self._open - idle,
+                created=self._created,
+                checkouts=self._checkouts,
+                waits=self._waits,
+                wait_time=self._wait_time,
+            )
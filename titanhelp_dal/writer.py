@@ -0,0 +1,131 @@
+from __future__ import annotations
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+# apply_batch(items) -> one result per item, or the exception for that item
+BatchFn = Callable[[List[Any]], List[Any]]
+
+_STOP = object()
+
+
+# ---- Writer statistics ----
+@dataclass(slots=True)
+class GroupCommitStats:
+    batches: int          # transactions committed (or attempted)
+    items: int            # writes submitted through the queue
+    largest_batch: int
+    queued: int           # writes waiting right now
+
+    @property
+    def mean_batch(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+
+# ---- Writer ----
+class GroupCommitWriter:
+    """
+    Funnels writes from many request threads through one writer thread.
+
+    The writer takes the first queued write, waits up to `max_wait` seconds
+    for more (never beyond `max_batch`), and hands the whole batch to
+    `apply_batch`, which commits it as one transaction. Each caller blocks
+    until its own write is committed, so durability is the same as writing
+    directly; only the number of transactions (and fsyncs) goes down.
+    """
+    def __init__(self, apply_batch: BatchFn, *, max_batch: int = 64, max_wait: float = 0.002) -> None:
+        if max_batch < 1:
+            raise ValueError("Batch size must be at least 1")
+        self._apply_batch = apply_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._closed = False
+        self._batches = self._items = self._largest = 0
+
+    def submit(self, item: Any) -> Any:
+        """Queue one write and block until it is committed; returns its result."""
+        future: "Future[Any]" = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Group-commit writer is closed")
+            self._ensure_thread()
+            self._queue.put((item, future))
+        return future.result()
+
+    def _ensure_thread(self) -> None:
+        # threads do not survive fork: start a fresh writer in the child
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._queue = queue.SimpleQueue()
+            self._thread = None
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="titanhelp-group-commit", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        q = self._queue
+        while True:
+            first = q.get()
+            if first is _STOP:
+                return
+            batch: List[Tuple[Any, Future]] = [first]
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = q.get(timeout=remaining) if remaining > 0 else q.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[Tuple[Any, Future]]) -> None:
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._largest = max(self._largest, len(batch))
+        try:
+            results = self._apply_batch([item for item, _ in batch])
+        except BaseException as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def close(self) -> None:
+        """Commit whatever is queued, then stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread if self._pid == os.getpid() else None
+            self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+
+    def stats(self) -> GroupCommitStats:
+        with self._lock:
+            return GroupCommitStats(
+                batches=self._batches,
+                items=self._items,
+                largest_batch=self._largest,
+                queued=self._queue.qsize(),
+            )